@@ -0,0 +1,44 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, Set
+
+logger = logging.getLogger(__name__)
+
+Pending = Dict[str, Set[int]]  # {date_key: numbers}
+
+
+# ==================== Limit ကျော် သတိပေးချက်များ ====================
+class LimitAlerts:
+    """Coalesces over-limit crossings into one admin message per ``delay`` seconds.
+
+    The first crossing starts the timer; anything that crosses before it
+    fires joins the same message, so a burst of slips produces one alert
+    rather than one per number. ``deliver(bot, pending)`` sends it and
+    returns False if by then nothing was worth sending.
+    """
+
+    def __init__(self, deliver: Callable[[object, Pending], Awaitable[bool]], delay: float = 5.0):
+        self.deliver = deliver
+        self.delay = delay
+        self.pending: Pending = {}
+        self.sent = 0
+        self._bot = None
+        self._task = None
+
+    def notify(self, bot, date_key: str, numbers: Iterable[int]):
+        self.pending.setdefault(date_key, set()).update(numbers)
+        self._bot = bot
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self._task = None
+        pending, self.pending = self.pending, {}
+        try:
+            if await self.deliver(self._bot, pending):
+                self.sent += 1
+        except Exception as e:
+            logger.error(f"Error sending limit alert: {str(e)}")
@@ -0,0 +1,237 @@
+"""Lines/sec of the old per-line branch cascade against bet_parser.parse_slip.
+
+    python benchmarks/bench_parser.py [--lines 200] [--rounds 50]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bet_parser import parse_slip  # noqa: E402
+from number_mask import mask_of  # noqa: E402
+
+SAMPLE_LINES = [
+    "12-1000",
+    "12/34/56-500",
+    "05 1000",
+    "23r1000",
+    "45r1000-500",
+    "1234 အခွေ 500",
+    "1234567 အခွေ 500",
+    "123အပူးပါအခွေ 300",
+    "အပူး 1000",
+    "ပါဝါ 500",
+    "နက္ခ 500",
+    "နခ 1000",
+    "ညီကို 200",
+    "ကိုညီ 200",
+    "5 ထိပ် 1000",
+    "3 ပိတ် 500",
+    "7 ဘရိတ် 200",
+    "4 အပါ 300",
+    "hello",
+]
+
+
+def _reverse_number(n):
+    s = str(n).zfill(2)
+    return int(s[::-1])
+
+
+def legacy_parse(text, closed_numbers):
+    """The handle_message loop as it was before bet_parser, kept as the benchmark baseline."""
+    all_bets = []
+    blocked_bets = []
+    total_amount = 0
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        if 'အခွေ' in line or 'အပူးပါအခွေ' in line:
+            parts = line.split('အခွေ')
+            base_part = parts[0]
+            amount_part = parts[1]
+            base_numbers = ''.join([c for c in base_part if c.isdigit()])
+            amount = int(''.join([c for c in amount_part if c.isdigit()]))
+            pairs = []
+            for i in range(len(base_numbers)):
+                for j in range(len(base_numbers)):
+                    if i != j:
+                        num = int(base_numbers[i] + base_numbers[j])
+                        if num not in pairs:
+                            pairs.append(num)
+            if 'အပူးပါအခွေ' in line:
+                for d in base_numbers:
+                    double = int(d + d)
+                    if double not in pairs:
+                        pairs.append(double)
+            for num in pairs:
+                if num in closed_numbers:
+                    blocked_bets.append(f"{num:02d}-{amount}")
+                else:
+                    all_bets.append(f"{num:02d}-{amount}")
+                    total_amount += amount
+            continue
+
+        special_cases = {
+            "အပူး": [0, 11, 22, 33, 44, 55, 66, 77, 88, 99],
+            "ပါဝါ": [5, 16, 27, 38, 49, 50, 61, 72, 83, 94],
+            "နက္ခ": [7, 18, 24, 35, 42, 53, 69, 70, 81, 96],
+            "ညီကို": [1, 12, 23, 34, 45, 56, 67, 78, 89, 90],
+            "ကိုညီ": [9, 10, 21, 32, 43, 54, 65, 76, 87, 98],
+        }
+        dynamic_types = ["ထိပ်", "ပိတ်", "ဘရိတ်", "အပါ"]
+
+        found_special = False
+        for case_name, case_numbers in special_cases.items():
+            case_variations = [case_name]
+            if case_name == "နက္ခ":
+                case_variations.extend(["နခ", "နက်ခ", "နတ်ခ", "နခက်", "နတ်ခက်", "နက်ခက်", "နတ်ခတ်", "နက်ခတ်", "နခတ်", "နခပ်"])
+            for variation in case_variations:
+                if line.startswith(variation):
+                    amount_str = line[len(variation):].strip()
+                    amount_str = ''.join([c for c in amount_str if c.isdigit()])
+                    if amount_str and int(amount_str) >= 100:
+                        amt = int(amount_str)
+                        for num in case_numbers:
+                            if num in closed_numbers:
+                                blocked_bets.append(f"{num:02d}-{amt}")
+                            else:
+                                all_bets.append(f"{num:02d}-{amt}")
+                                total_amount += amt
+                        found_special = True
+                        break
+                if found_special:
+                    break
+            if found_special:
+                break
+        if found_special:
+            continue
+
+        for dtype in dynamic_types:
+            if dtype in line:
+                numbers = []
+                amount = 0
+                parts = re.findall(r'\d+', line)
+                if parts:
+                    amount = int(parts[-1]) if int(parts[-1]) >= 100 else 0
+                    digits = [int(p) for p in parts[:-1] if len(p) == 1 and p.isdigit()]
+                if amount >= 100 and digits:
+                    if dtype == "ထိပ်":
+                        for d in digits:
+                            numbers.extend([d * 10 + j for j in range(10)])
+                    elif dtype == "ပိတ်":
+                        for d in digits:
+                            numbers.extend([j * 10 + d for j in range(10)])
+                    elif dtype == "ဘရိတ်":
+                        for d in digits:
+                            numbers.extend([n for n in range(100) if (n//10 + n%10) % 10 == d])
+                    elif dtype == "အပါ":
+                        for d in digits:
+                            tens = [d * 10 + j for j in range(10)]
+                            units = [j * 10 + d for j in range(10)]
+                            numbers.extend(list(set(tens + units)))
+                    for num in numbers:
+                        if num in closed_numbers:
+                            blocked_bets.append(f"{num:02d}-{amount}")
+                        else:
+                            all_bets.append(f"{num:02d}-{amount}")
+                            total_amount += amount
+                    found_special = True
+                    break
+        if found_special:
+            continue
+
+        if 'r' in line.lower():
+            r_pos = line.lower().find('r')
+            nums_before = [int(n) for n in re.findall(r'\d+', line[:r_pos]) if 0 <= int(n) <= 99]
+            amounts = [int(a) for a in re.findall(r'\d+', line[r_pos+1:]) if int(a) >= 100]
+            if nums_before and amounts:
+                rev_amount = amounts[0] if len(amounts) == 1 else amounts[1]
+                for num in nums_before:
+                    for n, a in ((num, amounts[0]), (_reverse_number(num), rev_amount)):
+                        if n in closed_numbers:
+                            blocked_bets.append(f"{n:02d}-{a}")
+                        else:
+                            all_bets.append(f"{n:02d}-{a}")
+                            total_amount += a
+                continue
+
+        numbers = []
+        amount = 0
+        all_numbers = re.findall(r'\d+', line)
+        if all_numbers:
+            if int(all_numbers[-1]) >= 100:
+                amount = int(all_numbers[-1])
+                numbers = [int(n) for n in all_numbers[:-1] if 0 <= int(n) <= 99]
+            else:
+                for i in range(len(all_numbers)-1):
+                    if 0 <= int(all_numbers[i]) <= 99 and int(all_numbers[i+1]) >= 100:
+                        numbers.append(int(all_numbers[i]))
+                        amount = int(all_numbers[i+1])
+                        break
+        if amount >= 100 and numbers:
+            for num in numbers:
+                if num in closed_numbers:
+                    blocked_bets.append(f"{num:02d}-{amount}")
+                else:
+                    all_bets.append(f"{num:02d}-{amount}")
+                    total_amount += amount
+
+    return all_bets, blocked_bets, total_amount
+
+
+def make_slip(rng, lines):
+    return "\n".join(rng.choice(SAMPLE_LINES) for _ in range(lines))
+
+
+def check_equivalent(slips, closed):
+    for text in slips:
+        old_bets, old_blocked, old_total = legacy_parse(text, closed)
+        slip = parse_slip(text, mask_of(closed))
+        new_bets = [f"{n:02d}-{a}" for n, a in slip.bets]
+        new_blocked = [f"{n:02d}-{a}" for n, a in slip.blocked]
+        # အပါ used to come out in set order; compare as multisets
+        assert sorted(old_bets) == sorted(new_bets), text
+        assert sorted(old_blocked) == sorted(new_blocked), text
+        assert old_total == slip.total_amount, text
+
+
+def bench(fn, slips, closed, rounds):
+    lines = sum(s.count("\n") + 1 for s in slips) * rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in slips:
+            fn(text, closed)
+    return lines / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200, help="lines per slip")
+    parser.add_argument("--slips", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    slips = [make_slip(rng, args.lines) for _ in range(args.slips)]
+    closed = {13, 31, 55, 77}
+
+    check_equivalent(slips, closed)
+
+    before = bench(legacy_parse, slips, closed, args.rounds)
+    after = bench(parse_slip, slips, mask_of(closed), args.rounds)
+    print(f"legacy cascade : {before:12,.0f} lines/sec")
+    print(f"parse_slip     : {after:12,.0f} lines/sec")
+    print(f"speedup        : {after / before:12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
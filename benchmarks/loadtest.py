@@ -0,0 +1,251 @@
+"""Offline load test: fire synthetic bet slips at bot.handle_message.
+
+    python benchmarks/loadtest.py [--messages 5000] [--concurrency 200] [--lines 12]
+
+Updates, contexts and the Telegram bot are stubbed in-process, so nothing
+touches the network. Reports p50/p99 handler latency, messages/sec and
+peak RSS, then checks that the draw ledger agrees with the agents' books.
+"""
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import random
+import resource
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot  # noqa: E402
+
+ADMIN_ID = 1
+
+NAKKHA_SPELLINGS = ("နက္ခ", "နခ", "နက်ခ", "နတ်ခ", "နခက်", "နတ်ခက်", "နက်ခက်", "နတ်ခတ်", "နက်ခတ်", "နခတ်", "နခပ်")
+
+
+# ==================== Stubbed Telegram objects ====================
+class FakeMessage:
+    ids = itertools.count(1)
+
+    def __init__(self, chat_id, text="", reply_latency=0.0):
+        self.message_id = next(self.ids)
+        self.chat_id = chat_id
+        self.text = text
+        self.reply_latency = reply_latency
+
+    async def reply_text(self, text, **kwargs):
+        if self.reply_latency:
+            await asyncio.sleep(self.reply_latency)
+        return FakeMessage(self.chat_id, text)
+
+
+class FakeCallbackQuery:
+    def __init__(self, user, data, message, reply_latency=0.0):
+        self.from_user = user
+        self.data = data
+        self.message = message
+        self.reply_latency = reply_latency
+        self.edits = []
+
+    async def answer(self, *args, **kwargs):
+        pass
+
+    async def edit_message_text(self, text, **kwargs):
+        if self.reply_latency:
+            await asyncio.sleep(self.reply_latency)
+        self.message.text = text
+        self.edits.append(text)
+
+
+class FakeBot:
+    def __init__(self, reply_latency=0.0):
+        self.reply_latency = reply_latency
+        self.sent = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.reply_latency:
+            await asyncio.sleep(self.reply_latency)
+        self.sent += 1
+        return FakeMessage(chat_id, text)
+
+
+def make_user(user_id, username):
+    return SimpleNamespace(id=user_id, username=username, first_name=username)
+
+
+def make_update(user, text, reply_latency=0.0):
+    return SimpleNamespace(
+        effective_user=user,
+        effective_chat=SimpleNamespace(id=user.id),
+        message=FakeMessage(user.id, text, reply_latency),
+        callback_query=None,
+    )
+
+
+def make_callback_update(user, data, reply_latency=0.0):
+    return SimpleNamespace(
+        effective_user=user,
+        effective_chat=SimpleNamespace(id=user.id),
+        message=None,
+        callback_query=FakeCallbackQuery(user, data, FakeMessage(user.id), reply_latency),
+    )
+
+
+def make_context(fake_bot, args=None):
+    return SimpleNamespace(args=args or [], user_data={}, chat_data={}, bot_data={}, bot=fake_bot)
+
+
+# ==================== Slip generator ====================
+class SlipGenerator:
+    """Random slips in the proportions agents actually send: mostly plain and r lines."""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.forms = [
+            (30, self.plain), (10, self.multi), (20, self.reverse), (8, self.wheel),
+            (3, self.wheel_doubles), (8, self.special), (4, self.nakkha), (12, self.dynamic),
+            (5, self.junk),
+        ]
+        self.weights = list(itertools.accumulate(w for w, _ in self.forms))
+
+    def amount(self):
+        return self.rng.choice((100, 200, 300, 500, 1000, 1500, 2000, 5000))
+
+    def num(self):
+        return f"{self.rng.randrange(100):02d}"
+
+    def plain(self):
+        return f"{self.num()}{self.rng.choice(('-', ' ', '='))}{self.amount()}"
+
+    def multi(self):
+        nums = "/".join(self.num() for _ in range(self.rng.randint(2, 6)))
+        return f"{nums}-{self.amount()}"
+
+    def reverse(self):
+        if self.rng.random() < 0.5:
+            return f"{self.num()}r{self.amount()}"
+        return f"{self.num()}r{self.amount()}-{self.amount()}"
+
+    def wheel(self):
+        digits = "".join(self.rng.sample("0123456789", self.rng.randint(3, 7)))
+        return f"{digits} အခွေ {self.amount()}"
+
+    def wheel_doubles(self):
+        digits = "".join(self.rng.sample("0123456789", self.rng.randint(3, 5)))
+        return f"{digits}အပူးပါအခွေ {self.amount()}"
+
+    def special(self):
+        return f"{self.rng.choice(('အပူး', 'ပါဝါ', 'ညီကို', 'ကိုညီ'))} {self.amount()}"
+
+    def nakkha(self):
+        return f"{self.rng.choice(NAKKHA_SPELLINGS)} {self.amount()}"
+
+    def dynamic(self):
+        digits = " ".join(str(d) for d in self.rng.sample(range(10), self.rng.randint(1, 2)))
+        return f"{digits} {self.rng.choice(('ထိပ်', 'ပိတ်', 'ဘရိတ်', 'အပါ'))} {self.amount()}"
+
+    def junk(self):
+        return self.rng.choice(("ok", "thanks", "12", "ဟုတ်ကဲ့"))
+
+    def line(self):
+        pick = self.rng.randrange(self.weights[-1])
+        for weight, form in zip(self.weights, self.forms):
+            if pick < weight:
+                return form[1]()
+
+    def slip(self, lines):
+        return "\n".join(self.line() for _ in range(max(1, int(self.rng.expovariate(1 / lines)))))
+
+
+# ==================== Runner ====================
+def reset_bot_state():
+    bot.apply_reset()
+    bot.tenants.current().message_store.clear()
+    bot.apply_admin(ADMIN_ID)
+    bot.apply_date_control(bot.get_current_date_key(), True)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def fire_slips(slips, agents, concurrency, reply_latency, fake_bot):
+    """Send every slip through handle_message, ``concurrency`` at a time; returns latencies."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i, text):
+        user = agents[i % len(agents)]
+        update = make_update(user, text, reply_latency)
+        async with semaphore:
+            started = time.perf_counter()
+            await bot.handle_message(update, make_context(fake_bot))
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(i, text) for i, text in enumerate(slips)))
+    return latencies
+
+
+def check_consistency():
+    """The draw ledger must equal the sum of every agent's book for the same draw."""
+    date_key = bot.get_current_date_key()
+    tenant = bot.tenants.current()
+    ledger_data = tenant.ledger.get(date_key)
+    per_number = [0] * 100
+    for dates in tenant.user_data.values():
+        book = dates.get(date_key)
+        if book is not None:
+            for num in range(100):
+                per_number[num] += book.by_number[num]
+    ledger_numbers = list(ledger_data.amounts) if ledger_data else [0] * 100
+    return ledger_numbers == per_number, sum(ledger_numbers)
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    print(f"{name}")
+    print(f"  messages      : {len(latencies)}")
+    print(f"  throughput    : {len(latencies) / elapsed:,.0f} msg/s")
+    print(f"  latency p50   : {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"  latency p99   : {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"  latency max   : {percentile(latencies, 1.0) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--agents", type=int, default=60)
+    parser.add_argument("--lines", type=float, default=12, help="mean lines per slip")
+    parser.add_argument("--reply-latency", type=float, default=0.0, help="simulated Bot API latency (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    generator = SlipGenerator(rng)
+    slips = [generator.slip(args.lines) for _ in range(args.messages)]
+    agents = [make_user(100 + i, f"agent{i:02d}") for i in range(args.agents)]
+    fake_bot = FakeBot(args.reply_latency)
+
+    reset_bot_state()
+    started = time.perf_counter()
+    latencies = asyncio.run(fire_slips(slips, agents, args.concurrency, args.reply_latency, fake_bot))
+    elapsed = time.perf_counter() - started
+
+    report("handle_message", latencies, elapsed)
+    print(f"  lines sent    : {sum(s.count(chr(10)) + 1 for s in slips):,}")
+    print(f"  peak RSS      : {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+    consistent, total = check_consistency()
+    print(f"  ledger total  : {total:,} ({'consistent' if consistent else 'MISMATCH'})")
+    if not consistent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Several dealer groups served by one process, in TENANT_MODE=chat.
+
+    python benchmarks/multi_tenant.py [--tenants 8] [--slips 4000] [--concurrency 200]
+
+Every group gets its own admin, break limit and closed numbers. The same
+agent usernames bet in every group, and one admin runs two of them. Slips
+from all groups are interleaved through the tenant wrapper the Application
+uses, then each group overbuys its over-limit numbers. Afterwards:
+
+  * every group's ledger equals the sum of its own books, number by number
+  * every group's ledger equals the slips sent to that group alone
+  * no group accepted a number it had closed
+  * the per-tenant metrics counted each group's slips
+  * a group that never sent /start got no book and its slips were dropped
+
+Exits non-zero if any check fails.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import (  # noqa: E402
+    FakeBot, SlipGenerator, bot, make_callback_update, make_context, make_update, make_user, percentile,
+)
+
+
+def in_chat(update, chat_id):
+    update.effective_chat = SimpleNamespace(id=chat_id)
+    return update
+
+
+def ledger_matches_books(tenant, date_key):
+    ledger_data = tenant.ledger.get(date_key)
+    per_number = [0] * 100
+    for dates in tenant.user_data.values():
+        book = dates.get(date_key)
+        if book is not None:
+            for num in range(100):
+                per_number[num] += book.by_number[num]
+    return (list(ledger_data.amounts) if ledger_data else [0] * 100) == per_number
+
+
+async def main_async(args):
+    rng = random.Random(args.seed)
+    generator = SlipGenerator(rng)
+    fake_bot = FakeBot()
+    bot.tenants.mode = "chat"
+    bot.outbound = bot.OutboundSender(per_chat_rate=1e9, per_chat_burst=1e9, global_rate=1e9)
+    date_key = bot.get_current_date_key()
+
+    handle_message = bot.tenants.instrument(bot.handle_message)
+    start = bot.tenants.instrument(bot.start)
+    dateopen = bot.tenants.instrument(bot.dateopen)
+    numclose = bot.tenants.instrument(bot.numclose)
+    break_command = bot.tenants.instrument(bot.break_command)
+    overbuy = bot.tenants.instrument(bot.overbuy)
+    overbuy_select_all = bot.tenants.instrument(bot.overbuy_select_all)
+    overbuy_confirm = bot.tenants.instrument(bot.overbuy_confirm)
+
+    # Group i is chat -1000 - i; admin 1 runs the first two groups, the rest have their own
+    chats = [-1000 - i for i in range(args.tenants)]
+    admins = {chat: make_user(1 if i < 2 else 2 + i, f"admin{i}") for i, chat in enumerate(chats)}
+    agents = [make_user(100 + i, f"agent{i:02d}") for i in range(args.agents)]
+    closed = {chat: rng.sample(range(100), 5) for chat in chats}
+
+    for chat in chats:
+        admin = admins[chat]
+        await start(in_chat(make_update(admin, "/start"), chat), make_context(fake_bot))
+        await dateopen(in_chat(make_update(admin, "/dateopen"), chat), make_context(fake_bot))
+        nums = " ".join(f"{num:02d}" for num in closed[chat])
+        await numclose(in_chat(make_update(admin, f"/numclose {nums}"), chat), make_context(fake_bot, nums.split()))
+
+    latencies = []
+    expected = dict.fromkeys(chats, 0)  # stake each group should hold, parsed here from its own slips
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def send(i):
+        chat = chats[i % len(chats)]
+        text = generator.slip(args.lines)
+        expected[chat] += bot.parse_slip(text, bot.mask_of(closed[chat])).bets.total()
+        update = in_chat(make_update(agents[i % len(agents)], text), chat)
+        async with semaphore:
+            started = time.perf_counter()
+            await handle_message(update, make_context(fake_bot))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(args.slips)))
+    elapsed = time.perf_counter() - started
+
+    stranger = -1000 - args.tenants
+    known = len(bot.tenants)
+    await handle_message(in_chat(make_update(agents[0], generator.slip(args.lines)), stranger), make_context(fake_bot))
+    await dateopen(in_chat(make_update(agents[0], "/dateopen"), stranger), make_context(fake_bot))
+
+    for chat in chats:
+        admin = admins[chat]
+        tenant = bot.tenants.get(str(chat))
+        limit = tenant.ledger[date_key].total // 100
+        await break_command(in_chat(make_update(admin, f"/break {limit}"), chat), make_context(fake_bot, [str(limit)]))
+        ctx = make_context(fake_bot, ["bookie"])
+        await overbuy(in_chat(make_update(admin, "/overbuy bookie"), chat), ctx)
+        await overbuy_select_all(in_chat(make_callback_update(admin, "overbuy_select_all"), chat), ctx)
+        await overbuy_confirm(in_chat(make_callback_update(admin, "overbuy_confirm"), chat), ctx)
+
+    failures = 0
+    if len(bot.tenants) != known or str(stranger) in {tenant.key for tenant in bot.tenants}:
+        print(f"chat {stranger} got a book without /start: FAILED")
+        failures += 1
+    metrics_text = bot.metrics.render()
+    for chat in chats:
+        tenant = bot.tenants.get(str(chat))
+        ledger_data = tenant.ledger[date_key]
+        over = ledger_data.over_limit()
+        ok_books = ledger_matches_books(tenant, date_key)
+        ok_total = ledger_data.total == expected[chat] - sum(
+            amt for amt in tenant.overbuy_list.get(date_key, {}).get("bookie", {}).values())
+        ok_closed = not any(ledger_data[num] for num in closed[chat])
+        ok_metrics = f'k2dbot_slips_accepted{{tenant="{chat}"}} {tenant.slips}' in metrics_text
+        ok = ok_books and ok_total and ok_closed and ok_metrics and not over
+        failures += not ok
+        print(f"tenant {chat}: admin {tenant.admin_id:>3}  slips {tenant.slips:5}  ledger {ledger_data.total:>12,}  "
+              f"{'ok' if ok else 'FAILED'}"
+              f"{'' if ok_books else ' (ledger != books)'}{'' if ok_total else ' (ledger != own slips)'}"
+              f"{'' if ok_closed else ' (closed number accepted)'}{'' if ok_metrics else ' (metrics)'}"
+              f"{'' if not over else ' (still over limit)'}")
+
+    latencies.sort()
+    print(f"{len(chats)} tenants, {len(latencies)} slips in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f} msg/s)  "
+          f"p50 {percentile(latencies, 0.5) * 1000:.2f} ms  p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--slips", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--agents", type=int, default=30)
+    parser.add_argument("--lines", type=float, default=6)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    failures = asyncio.run(main_async(args))
+    print("OK" if not failures else f"FAILED for {failures} tenant(s)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Bet latency while the admin builds large reports.
+
+    python benchmarks/report_latency.py [--agents 200] [--draws 60] [--bets 200]
+
+Fills ``--draws`` draws with random books, then sends a steady stream of
+slips through handle_message while the admin runs /dateall over every draw
+and /posthis for the heaviest agent. Bet latency is reported three ways:
+no report running, reports built on the event loop (the old behaviour) and
+reports built in bot.report_pool. Set REPORT_EXECUTOR=process to try the
+process pool.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import (  # noqa: E402
+    ADMIN_ID, FakeBot, SlipGenerator, bot, make_callback_update, make_context, make_update,
+    make_user, percentile, reset_bot_state,
+)
+
+
+class InlinePool(bot.ReportPool):
+    """Builds reports on the event loop, as the handlers did before the report pool."""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+
+def fill_draws(rng, agents, draws, bets_per_book):
+    """Books are filled directly rather than through the parser so large histories build quickly."""
+    date_keys = [f"{day // 2 + 1:02d}/01/2025 {'AM' if day % 2 == 0 else 'PM'}" for day in range(draws)]
+    amounts = (100, 200, 500, 1000)
+    slip_id = 0
+    for date_key in date_keys:
+        bot.apply_pnumber(date_key, rng.randrange(100))
+        for user in agents:
+            slip_id += 1
+            bets = bot.BetBatch((rng.randrange(100), rng.choice(amounts)) for _ in range(bets_per_book))
+            bot.apply_bets(user.username, date_key, slip_id, bets)
+    bot.tenants.current().slip_ids = iter(range(slip_id + 1, 1 << 62))
+    return date_keys
+
+
+async def run_reports(admin, fake_bot, date_keys, heaviest, count):
+    for i in range(count):
+        if i % 2 == 0:
+            ctx = make_context(fake_bot)
+            await bot.dateall(make_update(admin, "/dateall"), ctx)
+            ctx.user_data['dateall_keyboard'].set_all(True)
+            await bot.dateall_view(make_callback_update(admin, "dateall_view"), ctx)
+        else:
+            await bot.posthis_callback(make_callback_update(admin, f"posthis:{heaviest}"), make_context(fake_bot))
+
+
+async def measure(generator, agents, admin, fake_bot, args, date_keys, heaviest, with_reports):
+    latencies = []
+    reports_done = asyncio.Event()
+
+    async def bettor():
+        # Bets are due every ``interval`` seconds; latency runs from when a bet was due, so
+        # time spent waiting for a blocked event loop counts against it
+        started = time.perf_counter()
+        i = 0
+        while not reports_done.is_set():
+            due = started + i * args.interval
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            update = make_update(agents[i % len(agents)], generator.slip(6))
+            await bot.handle_message(update, make_context(fake_bot))
+            latencies.append(time.perf_counter() - due)
+            i += 1
+
+    async def admin_side():
+        if with_reports:
+            await run_reports(admin, fake_bot, date_keys, heaviest, args.reports)
+        else:
+            await asyncio.sleep(args.idle)
+        reports_done.set()
+
+    started = time.perf_counter()
+    await asyncio.gather(bettor(), admin_side())
+    return sorted(latencies), time.perf_counter() - started
+
+
+async def main_async(args):
+    rng = random.Random(args.seed)
+    generator = SlipGenerator(rng)
+    fake_bot = FakeBot()
+    admin = make_user(ADMIN_ID, "admin")
+    agents = [make_user(100 + i, f"agent{i:03d}") for i in range(args.agents)]
+
+    reset_bot_state()
+    bot.outbound = bot.OutboundSender(per_chat_rate=1e9, per_chat_burst=1e9, global_rate=1e9)  # time the build, not pacing
+    date_keys = fill_draws(rng, agents, args.draws, args.bets)
+    user_data = bot.tenants.current().user_data
+    heaviest = max(user_data, key=lambda u: sum(len(book) for book in user_data[u].values()))
+    print(f"{args.agents} agents x {args.draws} draws, {sum(len(b) for d in user_data.values() for b in d.values()):,} bets")
+
+    pool = bot.report_pool
+    for name, report_pool, with_reports in (("idle", pool, False), ("on event loop", InlinePool(), True),
+                                           ("report pool", pool, True)):
+        bot.report_pool = report_pool
+        latencies, elapsed = await measure(generator, agents, admin, fake_bot, args, date_keys, heaviest, with_reports)
+        print(f"{name:14}: {len(latencies):5} bets in {elapsed:5.2f}s  "
+              f"p50 {percentile(latencies, 0.5) * 1000:6.2f} ms  p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  "
+              f"max {percentile(latencies, 1.0) * 1000:7.2f} ms")
+    bot.report_pool = pool
+    pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--draws", type=int, default=60)
+    parser.add_argument("--bets", type=int, default=200, help="bets per agent per draw")
+    parser.add_argument("--reports", type=int, default=6, help="reports the admin runs back to back")
+    parser.add_argument("--interval", type=float, default=0.002, help="seconds between bets")
+    parser.add_argument("--idle", type=float, default=1.0, help="seconds of the no-report baseline")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
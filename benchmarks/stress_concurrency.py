@@ -0,0 +1,150 @@
+"""Concurrency stress test for bet ingestion, deletion and overbuy.
+
+    python benchmarks/stress_concurrency.py [--slips 3000] [--concurrency 256] [--rounds 3]
+
+Runs handlers the way python-telegram-bot does with concurrent_updates:
+every update is its own task, and the stubbed Bot API sleeps a random few
+milliseconds so handlers interleave at every await. Agents send slips while
+the admin double-taps Delete buttons and overbuy OK buttons. Afterwards:
+
+  * the draw ledger equals the sum of every book, number by number
+  * no slip was deleted twice and no overbuy selection was applied twice
+  * some slips were deleted while others were still arriving
+
+Exits non-zero if any check fails.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from loadtest import (  # noqa: E402
+    ADMIN_ID, FakeBot, SlipGenerator, bot, check_consistency, make_callback_update, make_context,
+    make_update, make_user, reset_bot_state,
+)
+
+DELETED = "✅ လောင်းကြေးဖျက်ပြီးပါပြီ"
+
+
+async def run_round(rng, generator, args, fake_bot, admin, agents, bookies):
+    def latency():
+        return rng.random() * args.jitter
+
+    date_key = bot.get_current_date_key()
+    sent = []  # (user, message_id) of every slip message
+    deleted = {}  # message_id -> number of successful deletes
+    racing = []  # successful deletes that finished before the last slip was in
+    overbuys = []  # successful confirms per overbuy session
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def send_slip(i):
+        user = agents[i % len(agents)]
+        update = make_update(user, generator.slip(args.lines), latency())
+        await asyncio.sleep(rng.random() * args.duration)  # arrivals spread over the round
+        async with semaphore:
+            await bot.handle_message(update, make_context(fake_bot))
+        sent.append((user, update.message.message_id))
+
+    async def delete(user, message_id):
+        data = f"confirm_delete:{user.id}:{message_id}:{date_key}"
+        taps = [make_callback_update(admin, data, latency()) for _ in range(2)]  # double tap
+        async with semaphore:
+            await asyncio.gather(*(bot.confirm_delete(tap, make_context(fake_bot)) for tap in taps))
+        deleted[message_id] = sum(DELETED in tap.callback_query.edits for tap in taps)
+        if deleted[message_id] and len(sent) < args.slips:
+            racing.append(message_id)
+
+    async def overbuy(bookie):
+        ctx = make_context(fake_bot, [bookie])
+        async with semaphore:
+            await bot.overbuy(make_update(admin, f"/overbuy {bookie}", latency()), ctx)
+            if bookie not in bot.tenants.current().overbuy_selections.get(date_key, {}):
+                return
+            select = make_callback_update(admin, "overbuy_select_all", latency())
+            await bot.overbuy_select_all(select, ctx)
+            taps = [make_callback_update(admin, "overbuy_confirm", latency()) for _ in range(2)]
+            await asyncio.gather(*(bot.overbuy_confirm(tap, ctx) for tap in taps))
+        overbuys.append(sum(any(e.startswith(f"{bookie} - ") for e in tap.callback_query.edits) for tap in taps))
+
+    async def deleter():
+        # Start with the first slip and spread the attempts over the round, so deletes race arrivals
+        while not sent:
+            await asyncio.sleep(args.jitter)
+        pause = args.duration / max(args.deletes, 1)
+        for _ in range(args.deletes):
+            await asyncio.sleep(rng.random() * 2 * pause)
+            user, message_id = sent[rng.randrange(len(sent))]
+            if message_id not in deleted:
+                deleted[message_id] = 0
+                await delete(user, message_id)
+
+    async def hedger():
+        # Set the limit once half the slips are in, a little below the average number, then
+        # hedge with a new bookie every 15% of slips while slips and deletes keep arriving
+        for i, bookie in enumerate(bookies):
+            while len(sent) < args.slips * (0.5 + 0.15 * i):
+                await asyncio.sleep(args.jitter)
+            if i == 0:
+                bot.apply_break_limit(date_key, int(bot.tenants.current().ledger[date_key].total / 100 * args.limit_factor))
+            await overbuy(bookie)
+
+    await asyncio.gather(
+        *(send_slip(i) for i in range(args.slips)),
+        *(deleter() for _ in range(2)),
+        hedger(),
+    )
+    return deleted, racing, overbuys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slips", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--agents", type=int, default=40)
+    parser.add_argument("--lines", type=float, default=6)
+    parser.add_argument("--deletes", type=int, default=60, help="delete attempts per deleter task")
+    parser.add_argument("--limit-factor", type=float, default=0.8,
+                        help="break limit as a multiple of the average stake per number at half time")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds over which slips arrive")
+    parser.add_argument("--jitter", type=float, default=0.004, help="max simulated Bot API latency (s)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    generator = SlipGenerator(rng)
+    fake_bot = FakeBot()
+    admin = make_user(ADMIN_ID, "admin")
+    agents = [make_user(100 + i, f"agent{i:02d}") for i in range(args.agents)]
+    bookies = [f"bookie{i}" for i in range(3)]
+
+    failures = asyncio.run(run_rounds(rng, generator, args, fake_bot, admin, agents, bookies))
+    print("OK" if not failures else f"FAILED in {failures} round(s)")
+    sys.exit(1 if failures else 0)
+
+
+async def run_rounds(rng, generator, args, fake_bot, admin, agents, bookies):
+    # One event loop for every round: the draw locks belong to the loop that first waits on them
+    failures = 0
+    for round_no in range(1, args.rounds + 1):
+        reset_bot_state()
+        deleted, racing, overbuys = await run_round(rng, generator, args, fake_bot, admin, agents, bookies)
+
+        consistent, total = check_consistency()
+        double_deletes = sum(1 for n in deleted.values() if n > 1)
+        double_overbuys = sum(1 for n in overbuys if n > 1)
+        ok = consistent and racing and not double_deletes and not double_overbuys
+        failures += not ok
+        print(f"round {round_no}: ledger {total:,} ({'consistent' if consistent else 'MISMATCH'}), "
+              f"deletes {sum(deleted.values())} (double {double_deletes}, during arrivals {len(racing)}), "
+              f"overbuys {sum(overbuys)}/{len(overbuys)} (double {double_overbuys})")
+    return failures
+
+
+if __name__ == "__main__":
+    main()
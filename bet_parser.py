@@ -0,0 +1,176 @@
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from bets import BetBatch
+from number_families import (
+    SPECIAL_CASES, DYNAMIC_EXPANSIONS, REVERSED, SPECIAL_MASKS, DYNAMIC_MASKS, wheel_numbers,
+)
+from number_mask import BIT, mask_of
+
+# Spelling variants agents use for နက္ခ
+SPECIAL_VARIATIONS = {
+    "နက္ခ": ("နက္ခ", "နခ", "နက်ခ", "နတ်ခ", "နခက်", "နတ်ခက်", "နက်ခက်", "နတ်ခတ်", "နက်ခတ်", "နခတ်", "နခပ်"),
+}
+
+# Checked in this order; the first one present in a line wins
+DYNAMIC_TYPES = ("ထိပ်", "ပိတ်", "ဘရိတ်", "အပါ")
+
+WHEEL = "အခွေ"
+WHEEL_WITH_DOUBLES = "အပူးပါအခွေ"
+
+# ==================== Compiled grammar ====================
+_SPECIAL_PREFIX = {
+    variation: family
+    for family in SPECIAL_CASES
+    for variation in SPECIAL_VARIATIONS.get(family, (family,))
+}
+_SPECIAL_RE = re.compile("|".join(sorted(map(re.escape, _SPECIAL_PREFIX), key=len, reverse=True)))
+
+# One scan per line: digit runs, wheel markers, dynamic keywords and the reverse marker
+_TOKEN_RE = re.compile(
+    r"(?P<num>\d+)"
+    r"|(?P<wheel>" + WHEEL_WITH_DOUBLES + "|" + WHEEL + ")"
+    r"|(?P<dyn>" + "|".join(sorted(DYNAMIC_TYPES, key=len, reverse=True)) + ")"
+    r"|(?P<rev>[rR])"
+)
+
+
+class ParsedSlip(NamedTuple):
+    bets: BetBatch
+    blocked: BetBatch
+    total_amount: int
+    invalid_lines: List[str]
+
+
+def _expand_line(line: str) -> Optional[List[Tuple[int, int]]]:
+    """Return the (number, amount) pairs for one slip line, or None if it does not parse."""
+    digits: List[str] = []
+    digit_pos: List[int] = []
+    wheels: List[Tuple[int, bool]] = []
+    dynamic = set()
+    rev_pos = -1
+
+    for m in _TOKEN_RE.finditer(line):
+        kind = m.lastgroup
+        if kind == "num":
+            digits.append(m.group())
+            digit_pos.append(m.start())
+        elif kind == "wheel":
+            wheels.append((m.start(), m.group() == WHEEL_WITH_DOUBLES))
+        elif kind == "dyn":
+            dynamic.add(m.group())
+        elif rev_pos < 0:
+            rev_pos = m.start()
+
+    # အခွေ / အပူးပါအခွေ
+    if wheels:
+        start = wheels[0][0]
+        stop = wheels[1][0] if len(wheels) > 1 else len(line)
+        base = "".join(d for d, p in zip(digits, digit_pos) if p < start)
+        amount_str = "".join(d for d, p in zip(digits, digit_pos) if start < p < stop)
+        if not amount_str:
+            return None
+        amount = int(amount_str)
+        with_doubles = any(doubles for _, doubles in wheels)
+        return [(num, amount) for num in wheel_numbers(base, with_doubles)]
+
+    values = [int(d) for d in digits]
+
+    # အပူး / ပါဝါ / နက္ခ / ညီကို / ကိုညီ
+    special = _SPECIAL_RE.match(line)
+    if special and digits:
+        amount = int("".join(digits))
+        if amount >= 100:
+            return [(num, amount) for num in SPECIAL_CASES[_SPECIAL_PREFIX[special.group()]]]
+
+    # ထိပ် / ပိတ် / ဘရိတ် / အပါ
+    if dynamic and values and values[-1] >= 100:
+        dtype = next(d for d in DYNAMIC_TYPES if d in dynamic)
+        heads = [v for d, v in zip(digits[:-1], values[:-1]) if len(d) == 1]
+        if heads:
+            table = DYNAMIC_EXPANSIONS[dtype]
+            return [(num, values[-1]) for d in heads for num in table[d]]
+
+    # 12r1000 / 12r1000-500
+    if rev_pos >= 0:
+        nums = [v for v, p in zip(values, digit_pos) if p < rev_pos and v <= 99]
+        amounts = [v for v, p in zip(values, digit_pos) if p > rev_pos and v >= 100]
+        if nums and amounts:
+            rev_amount = amounts[1] if len(amounts) > 1 else amounts[0]
+            result = []
+            for num in nums:
+                result.append((num, amounts[0]))
+                result.append((REVERSED[num], rev_amount))
+            return result
+
+    # 12-1000 / 12/34-1000
+    if values:
+        if values[-1] >= 100:
+            nums = [v for v in values[:-1] if v <= 99]
+            if nums:
+                return [(num, values[-1]) for num in nums]
+        else:
+            for i in range(len(values) - 1):
+                if values[i] <= 99 and values[i + 1] >= 100:
+                    return [(values[i], values[i + 1])]
+    return None
+
+
+def parse_slip(text: str, closed: int = 0) -> ParsedSlip:
+    """Parse a whole slip; numbers whose bit is set in the ``closed`` mask go to ``blocked``."""
+    bets = BetBatch()
+    blocked = BetBatch()
+    invalid: List[str] = []
+    total_amount = 0
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        expanded = _expand_line(line)
+        if expanded is None:
+            invalid.append(line)
+            continue
+        for num, amt in expanded:
+            if closed & BIT[num]:
+                blocked.append(num, amt)
+            else:
+                bets.append(num, amt)
+                total_amount += amt
+
+    return ParsedSlip(bets, blocked, total_amount, invalid)
+
+
+def parse_number_mask(text: str) -> int:
+    """Numbers named by a /numclose argument: a family keyword, a wheel, a dynamic type or plain numbers."""
+    special = _SPECIAL_RE.search(text)
+    if special:
+        return SPECIAL_MASKS[_SPECIAL_PREFIX[special.group()]]
+
+    digits = []
+    raw = []
+    dynamic = set()
+    for m in _TOKEN_RE.finditer(text):
+        if m.lastgroup == "num":
+            digits.append(int(m.group()))
+            raw.append(m.group())
+        elif m.lastgroup == "dyn":
+            dynamic.add(m.group())
+        elif m.lastgroup == "wheel":
+            return mask_of(wheel_numbers("".join(raw), m.group() == WHEEL_WITH_DOUBLES))
+    if dynamic:
+        dtype = next(d for d in DYNAMIC_TYPES if d in dynamic)
+        mask = 0
+        for d in digits:
+            if d <= 9:
+                mask |= DYNAMIC_MASKS[dtype][d]
+        return mask
+
+    mask = 0
+    reverse = 'r' in text.lower()
+    for num in digits:
+        if num <= 99:
+            mask |= BIT[num]
+            if reverse:
+                mask |= BIT[REVERSED[num]]
+    return mask
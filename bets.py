@@ -0,0 +1,85 @@
+from array import array
+from itertools import chain
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+# ==================== လောင်းကြေးစာရင်း ====================
+class BetBatch:
+    """Bets stored column-wise: one byte per number, one signed 64-bit int per amount.
+
+    Amounts are signed because overbuy entries are recorded as negative stakes.
+    Iterating yields (number, amount) pairs, so it reads like the old list of tuples.
+    """
+    __slots__ = ("nums", "amounts")
+
+    def __init__(self, pairs: Iterable[Tuple[int, int]] = ()):
+        self.nums = array('B')
+        self.amounts = array('q')
+        for num, amount in pairs:
+            self.append(num, amount)
+
+    def append(self, num: int, amount: int):
+        self.nums.append(num)
+        self.amounts.append(amount)
+
+    def extend(self, other: "BetBatch"):
+        self.nums.extend(other.nums)
+        self.amounts.extend(other.amounts)
+
+    def total(self) -> int:
+        return sum(self.amounts)
+
+    def render(self) -> str:
+        return "\n".join(f"{num:02d}-{amount}" for num, amount in self)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.nums, self.amounts)
+
+    def __len__(self) -> int:
+        return len(self.nums)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class UserDrawBook:
+    """One user's bets for one draw, grouped by the slip that placed them.
+
+    ``stake`` is the sum of all amounts and ``by_number`` the sum per number,
+    so settlement reads them directly instead of walking every bet. Removing
+    a slip costs only the size of that slip.
+    """
+    __slots__ = ("slips", "stake", "by_number")
+
+    def __init__(self):
+        self.slips: Dict[int, BetBatch] = {}
+        self.stake = 0
+        self.by_number = array('q', [0]) * 100
+
+    def add_slip(self, slip_id: int, bets: BetBatch):
+        self.slips[slip_id] = bets
+        by_number = self.by_number
+        for num, amount in bets:
+            by_number[num] += amount
+        self.stake += bets.total()
+
+    def remove_slip(self, slip_id: int) -> Optional[BetBatch]:
+        bets = self.slips.pop(slip_id, None)
+        if bets is not None:
+            by_number = self.by_number
+            for num, amount in bets:
+                by_number[num] -= amount
+            self.stake -= bets.total()
+        return bets
+
+    def total(self) -> int:
+        return self.stake
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return chain.from_iterable(self.slips.values())
+
+    def __len__(self) -> int:
+        return sum(len(bets) for bets in self.slips.values())
+
+    def __repr__(self) -> str:
+        return f"UserDrawBook({self.slips!r})"
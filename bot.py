@@ -1,5 +1,6 @@
 import os
 import logging
+import asyncio
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup
 from telegram.ext import (
     ApplicationBuilder, CommandHandler, MessageHandler,
@@ -8,11 +9,44 @@ from telegram.ext import (
 from datetime import datetime, time, timedelta
 from tabulate import tabulate
 import pytz
-import re
 import calendar
+import itertools
+import functools
+from bet_parser import parse_slip, parse_number_mask
+from bets import BetBatch, UserDrawBook
+from draw_ledger import DrawLedger
+from number_mask import mask_of, numbers_in, format_mask
+from number_families import wheel_cache_info
+from journal import Journal
+from storage import SqliteStorage
+from outbound import OutboundSender
+from metrics import Metrics, ErrorCounter, start_metrics_server
+from alerts import LimitAlerts
+from hedging import plan_hedge, parse_bookies, parse_pins
+from selection import SelectionKeyboard
+from reports import ReportPool, build_packed, ledger_lines, total_lines, tsent_lines, history_lines, dateall_lines
+from tenants import DEFAULT_TENANT, Tenant, TenantContext, Tenants
 
 # Environment variable
 TOKEN = os.getenv("BOT_TOKEN")
+DATA_DIR = os.getenv("DATA_DIR", "data")
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")  # memory | sqlite, which keeps Delete buttons across restarts
+BOT_MODE = os.getenv("BOT_MODE", "polling")  # polling | webhook
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")  # Public base URL, required for webhook mode
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # Checked on every webhook POST; generated per run if unset
+PORT = int(os.getenv("PORT", "8080"))
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")  # e.g. http://127.0.0.1:8081/bot for tools/stub_telegram.py
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))  # 0 disables the /metrics endpoint
+MESSAGE_STORE_SIZE = int(os.getenv("MESSAGE_STORE_SIZE", "20000"))  # Delete buttons kept in memory when sqlite holds the rest
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "0"))  # >0 processes that many updates at once
+LIMIT_ALERT_DELAY = float(os.getenv("LIMIT_ALERT_DELAY", "5"))  # Seconds over-limit alerts are gathered for
+REPORT_EXECUTOR = os.getenv("REPORT_EXECUTOR", "thread")  # thread | process, where heavy reports are built
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "256"))  # Rendered /ledger and /posthis reports kept
+TENANT_MODE = os.getenv("TENANT_MODE", "single")  # single | chat, where every chat keeps its own book
+TENANT_CHATS = os.getenv("TENANT_CHATS")  # Comma-separated chat ids allowed a book in chat mode; unset = any chat that sends /start
 
 # Logging
 logging.basicConfig(
@@ -24,26 +58,49 @@ logger = logging.getLogger(__name__)
 # Timezone setup
 MYANMAR_TIMEZONE = pytz.timezone('Asia/Yangon')
 
-# Globals
-admin_id = None
-user_data = {}  # {username: {date_key: [(num, amt)]}}
-ledger = {}     # {date_key: {number: total_amount}}
-break_limits = {}  # {date_key: limit}
-pnumber_per_date = {}  # {date_key: power_number}
-date_control = {}  # {date_key: True/False}
-overbuy_list = {}  # {date_key: {username: {num: amount}}}
-message_store = {}  # {(user_id, message_id): (sent_message_id, bets, total_amount, date_key)}
-overbuy_selections = {}  # {date_key: {username: {num: amount}}}
-current_working_date = None  # For admin date selection
-closed_numbers = set()  # Store closed numbers
-
-# Com and Za data
-com_data = {}
-za_data = {}
-
-def reverse_number(n):
-    s = str(n).zfill(2)
-    return int(s[::-1])
+# Every book this process serves; each update is handled against the one its chat belongs to
+def new_tenant(key):
+    tenant = Tenant(key, MESSAGE_STORE_SIZE, RENDER_CACHE_SIZE)
+    tenant.limit_alerts = LimitAlerts(functools.partial(send_limit_alert, tenant), LIMIT_ALERT_DELAY)
+    return tenant
+
+tenants = Tenants(
+    new_tenant, TENANT_MODE,
+    [chat.strip() for chat in TENANT_CHATS.split(",") if chat.strip()] if TENANT_CHATS else None
+)
+
+# Packs and paces long reports so they respect Telegram's size and flood limits
+outbound = OutboundSender()
+
+# Builds /total, /tsent, /posthis and /dateall reports off the event loop
+report_pool = ReportPool(REPORT_EXECUTOR, REPORT_WORKERS)
+
+# Per-handler calls, errors and latency; served on /metrics and shown by /stats
+metrics = Metrics(tenant_of=lambda: tenants.current().key)
+logging.getLogger().addHandler(ErrorCounter())
+
+def wheel_cache_hit_ratio():
+    info = wheel_cache_info()
+    return info.hits / max(1, info.hits + info.misses)
+
+def per_tenant(read):
+    return lambda: {tenant.key: read(tenant) for tenant in tenants}
+
+metrics.gauge("wheel_cache_hits", "Wheel expansions served from the cache.", lambda: wheel_cache_info().hits)
+metrics.gauge("wheel_cache_misses", "Wheel expansions computed.", lambda: wheel_cache_info().misses)
+metrics.gauge("wheel_cache_hit_ratio", "Share of wheel expansions served from the cache.", wheel_cache_hit_ratio)
+metrics.gauge("reports_running", "Reports being built in the report pool.", lambda: report_pool.running)
+metrics.gauge("tenants", "Books served by this process.", lambda: len(tenants))
+metrics.tenant_gauge("agents", "Agents with a book.", per_tenant(lambda tenant: len(tenant.user_data)))
+metrics.tenant_gauge("slips_accepted", "Slips accepted since the bot started.", per_tenant(lambda tenant: tenant.slips))
+metrics.tenant_gauge("message_store_entries", "Delete-button references held in memory.",
+                     per_tenant(lambda tenant: len(tenant.message_store)))
+metrics.tenant_gauge("render_cache_hits", "Reports sent from the render cache.",
+                     per_tenant(lambda tenant: tenant.render_cache.hits))
+metrics.tenant_gauge("render_cache_misses", "Reports rendered because nothing current was cached.",
+                     per_tenant(lambda tenant: tenant.render_cache.misses))
+metrics.tenant_gauge("limit_alerts_sent", "Over-limit alert messages sent to the admin.",
+                     per_tenant(lambda tenant: tenant.limit_alerts.sent))
 
 def get_time_segment():
     now = datetime.now(MYANMAR_TIMEZONE).time()
@@ -53,22 +110,371 @@ def get_current_date_key():
     now = datetime.now(MYANMAR_TIMEZONE)
     return f"{now.strftime('%d/%m/%Y')} {get_time_segment()}"
 
+def get_next_date_key():
+    now = datetime.now(MYANMAR_TIMEZONE)
+    if get_time_segment() == "AM":
+        return f"{now.strftime('%d/%m/%Y')} PM"
+    return f"{(now + timedelta(days=1)).strftime('%d/%m/%Y')} AM"
+
+def get_draw_ledger(date_key):
+    tenant = tenants.current()
+    if date_key not in tenant.ledger:
+        tenant.ledger[date_key] = DrawLedger(tenant.break_limits.get(date_key))
+        tenant.draws.touch(date_key)
+    return tenant.ledger[date_key]
+
 def get_available_dates():
-    dates = set()
-    # Get dates from user data
-    for user_data_dict in user_data.values():
-        dates.update(user_data_dict.keys())
-    # Get dates from ledger
-    dates.update(ledger.keys())
-    # Get dates from break limits
-    dates.update(break_limits.keys())
-    # Get dates from pnumber
-    dates.update(pnumber_per_date.keys())
-    return sorted(dates, reverse=True)
+    return tenants.current().draws.newest_first()
+
+def date_labels(dates):
+    """(date_key, label) for the date pickers, with the power number when one is set."""
+    tenant = tenants.current()
+    labels = []
+    for date in dates:
+        pnum = tenant.pnumber_per_date.get(date, None)
+        pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
+        labels.append((date, f"{date}{pnum_str}"))
+    return labels
+
+# Buttons under each selection list, and which user_data entry holds the list for its page buttons
+OVERBUY_FOOTER = [
+    [InlineKeyboardButton("Select All", callback_data="overbuy_select_all"),
+     InlineKeyboardButton("Unselect All", callback_data="overbuy_unselect_all")],
+    [InlineKeyboardButton("OK", callback_data="overbuy_confirm")],
+]
+DATEALL_FOOTER = [[InlineKeyboardButton("👁‍🗨 View", callback_data="dateall_view")]]
+DATEDELETE_FOOTER = [[InlineKeyboardButton("✅ Delete Selected", callback_data="datedelete_confirm")]]
+SELECTION_KEYBOARDS = {
+    "overbuy_page": "overbuy_keyboard",
+    "dateall_page": "dateall_keyboard",
+    "datedelete_page": "datedelete_keyboard",
+}
+
+# ==================== State mutations ====================
+# Every change to the book goes through one of these so it can be journaled
+# and replayed after a restart.
+
+def record(op, **fields):
+    tenant = tenants.current()
+    if tenant.journal is None:
+        return
+    tenant.journal.record(op, **fields)
+    if tenant.journal.needs_snapshot():
+        tenant.journal.snapshot(dump_state())
+
+def apply_admin(user_id):
+    tenant = tenants.current()
+    tenant.admin_id = user_id
+    record("admin", user_id=user_id)
+
+def apply_date_control(date_key, is_open):
+    tenant = tenants.current()
+    tenant.date_control[date_key] = is_open
+    record("date_control", date_key=date_key, is_open=is_open)
+
+def apply_closed_numbers(date_key, numbers):
+    tenant = tenants.current()
+    mask = mask_of(numbers)
+    if mask:
+        tenant.closed_numbers[date_key] = mask
+    else:
+        tenant.closed_numbers.pop(date_key, None)
+    tenant.draw_snapshots.touch(date_key)  # /ledger marks closed numbers
+    record("closed_numbers", date_key=date_key, numbers=numbers_in(mask))
+
+def apply_bets(username, date_key, slip_id, bets):
+    tenant = tenants.current()
+    tenant.last_slip_id = max(tenant.last_slip_id, slip_id)
+    tenant.draws.touch(date_key)
+    if username not in tenant.user_data:
+        tenant.user_data[username] = {}
+    if date_key not in tenant.user_data[username]:
+        tenant.user_data[username][date_key] = UserDrawBook()
+
+    ledger_data = get_draw_ledger(date_key)
+    crossed = []  # numbers this slip pushed over the break limit
+    for num, amt in bets:
+        if ledger_data.add(num, amt):
+            crossed.append(num)
+    if bets:
+        tenant.user_data[username][date_key].add_slip(slip_id, bets)
+    tenant.draw_snapshots.touch(date_key, username)
+    record("bets", username=username, date_key=date_key, slip_id=slip_id,
+           nums=bets.nums.tolist(), amounts=bets.amounts.tolist())
+    return crossed
+
+def apply_delete(username, date_key, slip_id):
+    tenant = tenants.current()
+    book = tenant.user_data.get(username, {}).get(date_key)
+    bets = book.remove_slip(slip_id) if book is not None else None
+    if bets is None:
+        return None
+
+    if date_key in tenant.ledger:
+        ledger_data = tenant.ledger[date_key]
+        for num, amt in bets:
+            ledger_data.remove(num, amt)
+        # Remove date from ledger if empty
+        if not ledger_data:
+            del tenant.ledger[date_key]
+
+    if not book.slips:
+        del tenant.user_data[username][date_key]
+        if not tenant.user_data[username]:
+            del tenant.user_data[username]
+    tenant.storage.remove_slip(slip_id)
+    tenant.draw_snapshots.touch(date_key, username)
+    record("delete", username=username, date_key=date_key, slip_id=slip_id)
+    return bets
+
+def _overbuy(username, date_key, slip_id, selected):
+    tenant = tenants.current()
+    tenant.last_slip_id = max(tenant.last_slip_id, slip_id)
+    if username not in tenant.user_data:
+        tenant.user_data[username] = {}
+    if date_key not in tenant.user_data[username]:
+        tenant.user_data[username][date_key] = UserDrawBook()
+
+    for num, amt in selected.items():
+        tenant.ledger[date_key].remove(num, amt)
+    bets = BetBatch((num, -amt) for num, amt in selected.items())
+    tenant.user_data[username][date_key].add_slip(slip_id, bets)
+
+    bought = tenant.overbuy_list.setdefault(date_key, {}).setdefault(username, {})
+    for num, amt in selected.items():
+        bought[num] = bought.get(num, 0) + amt
+    tenant.draw_snapshots.touch(date_key, username)
+
+def apply_overbuy(username, date_key, slip_id, selected):
+    _overbuy(username, date_key, slip_id, selected)
+    record("overbuy", username=username, date_key=date_key, slip_id=slip_id,
+           selected=list(selected.items()))
+
+def apply_hedge(date_key, allocations):
+    """Apply a whole hedge plan as one batch: [(bookie, slip_id, {num: amount}), ...]."""
+    for username, slip_id, selected in allocations:
+        _overbuy(username, date_key, slip_id, selected)
+    record("hedge", date_key=date_key,
+           allocations=[[username, slip_id, list(selected.items())] for username, slip_id, selected in allocations])
+
+def apply_hedge_bookies(bookies):
+    tenant = tenants.current()
+    tenant.hedge_bookies = [tuple(bookie) for bookie in bookies]
+    record("hedge_bookies", bookies=[list(bookie) for bookie in tenant.hedge_bookies])
+
+def apply_break_limit(date_key, limit):
+    tenant = tenants.current()
+    tenant.draws.touch(date_key)
+    tenant.break_limits[date_key] = limit
+    if date_key in tenant.ledger:
+        tenant.ledger[date_key].set_limit(limit)
+    tenant.draw_snapshots.touch(date_key)
+    record("break_limit", date_key=date_key, limit=limit)
+
+def apply_pnumber(date_key, num):
+    tenant = tenants.current()
+    tenant.draws.touch(date_key)
+    tenant.pnumber_per_date[date_key] = num
+    tenant.draw_snapshots.touch(date_key)
+    record("pnumber", date_key=date_key, num=num)
+
+def apply_comza(username, com, za):
+    tenant = tenants.current()
+    tenant.com_data[username] = com
+    tenant.za_data[username] = za
+    record("comza", username=username, com=com, za=za)
+
+def apply_add_user(username, com, za):
+    tenant = tenants.current()
+    if username not in tenant.user_data:
+        tenant.user_data[username] = {}
+    tenant.com_data[username] = com
+    tenant.za_data[username] = za
+    record("add_user", username=username, com=com, za=za)
+
+def apply_reset():
+    tenant = tenants.current()
+    tenant.user_data = {}
+    tenant.ledger = {}
+    tenant.za_data = {}
+    tenant.com_data = {}
+    tenant.date_control = {}
+    tenant.overbuy_list = {}
+    tenant.overbuy_selections = {}
+    tenant.break_limits = {}
+    tenant.pnumber_per_date = {}
+    tenant.closed_numbers = {}
+    tenant.draws.clear()
+    tenant.draw_snapshots.clear()
+    tenant.render_cache.clear()
+    tenant.message_store.clear()
+    tenant.storage.clear()
+    record("reset")
+
+def apply_delete_dates(date_keys):
+    tenant = tenants.current()
+    for date_key in date_keys:
+        # Remove from user_data
+        for user in list(tenant.user_data.keys()):
+            if date_key in tenant.user_data[user]:
+                del tenant.user_data[user][date_key]
+            # Remove user if no dates left
+            if not tenant.user_data[user]:
+                del tenant.user_data[user]
+
+        for store in (tenant.ledger, tenant.break_limits, tenant.pnumber_per_date, tenant.date_control,
+                      tenant.overbuy_list, tenant.overbuy_selections, tenant.closed_numbers):
+            if date_key in store:
+                del store[date_key]
+        tenant.draws.discard(date_key)
+        tenant.draw_snapshots.discard(date_key)
+        tenant.message_store.discard_draw(date_key)
+    tenant.storage.remove_dates(date_keys)
+    record("delete_dates", date_keys=list(date_keys))
+
+# ==================== Snapshot and recovery ====================
+def dump_state():
+    tenant = tenants.current()
+    return {
+        "admin_id": tenant.admin_id,
+        "user_data": {
+            username: {
+                date_key: [[slip_id, bets.nums.tolist(), bets.amounts.tolist()] for slip_id, bets in book.slips.items()]
+                for date_key, book in dates.items()
+            }
+            for username, dates in tenant.user_data.items()
+        },
+        "ledger": {date_key: ledger_data.amounts.tolist() for date_key, ledger_data in tenant.ledger.items()},
+        "break_limits": tenant.break_limits,
+        "pnumber_per_date": tenant.pnumber_per_date,
+        "date_control": tenant.date_control,
+        "overbuy_list": {
+            date_key: {username: list(selected.items()) for username, selected in users.items()}
+            for date_key, users in tenant.overbuy_list.items()
+        },
+        "com_data": tenant.com_data,
+        "za_data": tenant.za_data,
+        "closed_numbers": {date_key: numbers_in(mask) for date_key, mask in tenant.closed_numbers.items()},
+        "hedge_bookies": [list(bookie) for bookie in tenant.hedge_bookies],
+        "last_slip_id": tenant.last_slip_id,
+    }
+
+def load_state(state):
+    tenant = tenants.current()
+    tenant.admin_id = state["admin_id"]
+    tenant.hedge_bookies = [tuple(bookie) for bookie in state.get("hedge_bookies", [])]
+    tenant.break_limits.update(state["break_limits"])
+    tenant.pnumber_per_date.update(state["pnumber_per_date"])
+    tenant.date_control.update(state["date_control"])
+    tenant.com_data.update(state["com_data"])
+    tenant.za_data.update(state["za_data"])
+    closed = state["closed_numbers"]
+    if isinstance(closed, list):  # snapshots from before closed numbers were kept per draw
+        closed = {get_current_date_key(): closed}
+    for date_key, numbers in closed.items():
+        tenant.closed_numbers[date_key] = mask_of(numbers)
+
+    for username, dates in state["user_data"].items():
+        tenant.user_data[username] = {}
+        for date_key, slips in dates.items():
+            book = tenant.user_data[username][date_key] = UserDrawBook()
+            for slip_id, nums, amounts in slips:
+                book.add_slip(slip_id, BetBatch(zip(nums, amounts)))
+                tenant.last_slip_id = max(tenant.last_slip_id, slip_id)  # snapshots without last_slip_id
+    tenant.last_slip_id = max(tenant.last_slip_id, state.get("last_slip_id", 0))
+
+    for date_key, amounts in state["ledger"].items():
+        ledger_data = get_draw_ledger(date_key)
+        for num, amt in enumerate(amounts):
+            if amt:
+                ledger_data.add(num, amt)
+
+    for date_key, users in state["overbuy_list"].items():
+        tenant.overbuy_list[date_key] = {username: dict(selected) for username, selected in users.items()}
+
+    for date_key in list(tenant.break_limits) + list(tenant.pnumber_per_date):
+        tenant.draws.touch(date_key)
+    for dates in tenant.user_data.values():
+        for date_key in dates:
+            tenant.draws.touch(date_key)
+    tenant.draw_snapshots.clear()
+
+def replay_entry(op, fields):
+    if op == "admin":
+        apply_admin(**fields)
+    elif op == "date_control":
+        apply_date_control(**fields)
+    elif op == "closed_numbers":
+        fields.setdefault("date_key", get_current_date_key())  # entries from before closed numbers were per draw
+        apply_closed_numbers(**fields)
+    elif op == "bets":
+        bets = BetBatch(zip(fields.pop("nums"), fields.pop("amounts")))
+        apply_bets(bets=bets, **fields)
+    elif op == "delete":
+        apply_delete(**fields)
+    elif op == "overbuy":
+        apply_overbuy(fields["username"], fields["date_key"], fields["slip_id"], dict(fields["selected"]))
+    elif op == "hedge":
+        apply_hedge(fields["date_key"], [(username, slip_id, dict(selected))
+                                         for username, slip_id, selected in fields["allocations"]])
+    elif op == "hedge_bookies":
+        apply_hedge_bookies(fields["bookies"])
+    elif op == "break_limit":
+        apply_break_limit(**fields)
+    elif op == "pnumber":
+        apply_pnumber(**fields)
+    elif op == "comza":
+        apply_comza(**fields)
+    elif op == "add_user":
+        apply_add_user(**fields)
+    elif op == "reset":
+        apply_reset()
+    elif op == "delete_dates":
+        apply_delete_dates(fields["date_keys"])
+    else:
+        logger.warning(f"Unknown journal entry: {op}")
+
+def restore_state(state_journal):
+    """Load the latest snapshot and replay the journal on top of it."""
+    tenant = tenants.current()
+    state = state_journal.load_snapshot()
+    if state:
+        load_state(state)
+    replayed = 0
+    for op, fields in state_journal.replay():
+        replay_entry(op, fields)
+        replayed += 1
+
+    # Past every id ever handed out, not just those still in the books: a deleted slip's
+    # Delete button may still be saved, and must not resolve to a newer slip
+    tenant.slip_ids = itertools.count(tenant.last_slip_id + 1)
+    logger.info(f"Restored {tenant.key}: snapshot={'yes' if state else 'no'}, replayed {replayed} journal entries")
+
+def tenant_dir(key):
+    # The default tenant keeps the layout single-book deployments already have on disk
+    return DATA_DIR if key == DEFAULT_TENANT else os.path.join(DATA_DIR, "tenants", key)
+
+def open_tenant(key):
+    """A tenant restored from its own journal and storage, journaling from then on."""
+    tenant = new_tenant(key)
+    directory = tenant_dir(key)
+    state_journal = Journal(directory)
+    if STORAGE_BACKEND == "sqlite":
+        tenant.storage = SqliteStorage(os.path.join(directory, "bets.sqlite3"))
+
+    # Replay before assigning the journal so recovery is not journaled again
+    with tenants.using(tenant):
+        restore_state(state_journal)
+        state_journal.open()
+        tenant.journal = state_journal
+        if state_journal.needs_snapshot():
+            state_journal.snapshot(dump_state())
+    return tenant
 
 async def show_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     keyboard = []
-    if update.effective_user.id == admin_id:
+    if update.effective_user.id == tenant.admin_id:
         keyboard = [
             ["အရောင်းဖွင့်ရန်", "အရောင်းပိတ်ရန်"],
             ["လည်ချာ", "ဘရိတ်သတ်မှတ်ရန်"],
@@ -144,128 +550,130 @@ async def handle_menu_selection(update: Update, context: ContextTypes.DEFAULT_TY
             await numclose(update, context)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, current_working_date
-    admin_id = update.effective_user.id
-    current_working_date = get_current_date_key()
-    logger.info(f"Admin set to: {admin_id}")
+    tenant = tenants.current()
+    apply_admin(update.effective_user.id)
+    tenant.current_working_date = get_current_date_key()
+    logger.info(f"Admin set to: {tenant.admin_id}")
     await update.message.reply_text("🤖 Bot started. Admin privileges granted!")
     await show_menu(update, context)
 
 async def dateopen(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
-    if update.effective_user.id != admin_id:
+    tenant = tenants.current()
+    if update.effective_user.id != tenant.admin_id:
         await update.message.reply_text("❌ Admin only command")
         return
         
     key = get_current_date_key()
-    date_control[key] = True
+    apply_date_control(key, True)
     logger.info(f"Ledger opened for {key}")
     await update.message.reply_text(f"✅ {key} စာရင်းဖွင့်ပြီးပါပြီ")
 
 async def dateclose(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
-    if update.effective_user.id != admin_id:
+    tenant = tenants.current()
+    if update.effective_user.id != tenant.admin_id:
         await update.message.reply_text("❌ Admin only command")
         return
         
     key = get_current_date_key()
-    date_control[key] = False
+    apply_date_control(key, False)
+    tenant.message_store.evict_draw(key)
     logger.info(f"Ledger closed for {key}")
     await update.message.reply_text(f"✅ {key} စာရင်းပိတ်လိုက်ပါပြီ")
 
 async def numclose(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, closed_numbers
-    if update.effective_user.id != admin_id:
+    tenant = tenants.current()
+    if update.effective_user.id != tenant.admin_id:
         await update.message.reply_text("❌ Admin only command")
         return
 
-    if not context.args:
-        if closed_numbers:
-            nums_str = " ".join(f"{n:02d}" for n in sorted(closed_numbers))
-            keyboard = [[InlineKeyboardButton("🗑 Delete All", callback_data="numclose_delete_all")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+    # /numclose [next] [open] [numbers]: "next" targets the coming session, "open" reopens
+    args = list(context.args or [])
+    key = get_current_date_key()
+    if args and args[0].lower() == "next":
+        key = get_next_date_key()
+        args = args[1:]
+    reopen = bool(args) and args[0].lower() == "open"
+    if reopen:
+        args = args[1:]
+    closed = tenant.closed_numbers.get(key, 0)
+    keyboard = [[InlineKeyboardButton("🗑 Delete All", callback_data=f"numclose_delete_all:{key}")]]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    if not args:
+        if closed:
             await update.message.reply_text(
-                f"🔒 Closed Numbers: {nums_str}",
+                f"🔒 {key} Closed Numbers: {format_mask(closed)}",
                 reply_markup=reply_markup
             )
         else:
-            await update.message.reply_text("ℹ️ Usage: /numclose [numbers]\nℹ️ No numbers currently closed")
+            await update.message.reply_text(
+                f"ℹ️ Usage: /numclose [next] [open] [numbers]\nℹ️ No numbers currently closed for {key}"
+            )
         return
 
     try:
-        text = " ".join(context.args)
-        new_numbers = set()
-        
-        # Check for special cases
-        special_cases = {
-            "အပူး": [0, 11, 22, 33, 44, 55, 66, 77, 88, 99],
-            "ပါဝါ": [5, 16, 27, 38, 49, 50, 61, 72, 83, 94],
-            "နက္ခ": [7, 18, 24, 35, 42, 53, 69, 70, 81, 96],
-            "ညီကို": [1, 12, 23, 34, 45, 56, 67, 78, 89, 90],
-            "ကိုညီ": [9, 10, 21, 32, 43, 54, 65, 76, 87, 98],
-        }
-
-        dynamic_types = ["ထိပ်", "ပိတ်", "ဘရိတ်", "အပါ"]
-        
-        found_special = False
-        for case_name, case_numbers in special_cases.items():
-            if case_name in text:
-                new_numbers.update(case_numbers)
-                found_special = True
-                break
-
-        if not found_special:
-            for dtype in dynamic_types:
-                if dtype in text:
-                    parts = re.findall(r'\d+', text)
-                    if parts:
-                        digit = int(parts[0])
-                        if dtype == "ထိပ်":
-                            new_numbers.update([digit * 10 + j for j in range(10)])
-                        elif dtype == "ပိတ်":
-                            new_numbers.update([j * 10 + digit for j in range(10)])
-                        elif dtype == "ဘရိတ်":
-                            new_numbers.update([n for n in range(100) if (n//10 + n%10) % 10 == digit])
-                        elif dtype == "အပါ":
-                            tens = [digit * 10 + j for j in range(10)]
-                            units = [j * 10 + digit for j in range(10)]
-                            new_numbers.update(tens + units)
-                    found_special = True
-                    break
-
-        if not found_special:
-            numbers = re.findall(r'\d+', text)
-            for num in numbers:
-                num_int = int(num)
-                if 0 <= num_int <= 99:
-                    new_numbers.add(num_int)
-                if 'r' in text.lower():
-                    new_numbers.add(reverse_number(num_int))
-
-        closed_numbers.update(new_numbers)
-        
-        nums_str = " ".join(f"{n:02d}" for n in sorted(closed_numbers))
-        keyboard = [[InlineKeyboardButton("🗑 Delete All", callback_data="numclose_delete_all")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            f"✅ Closed numbers updated:\n🔒 {nums_str}",
-            reply_markup=reply_markup
-        )
+        mask = parse_number_mask(" ".join(args))
+        if not mask:
+            await update.message.reply_text("❌ Error processing numbers. Please check your input.")
+            return
+
+        closed = closed & ~mask if reopen else closed | mask
+        apply_closed_numbers(key, numbers_in(closed))
+
+        if closed:
+            await update.message.reply_text(
+                f"✅ {key} Closed numbers updated:\n🔒 {format_mask(closed)}",
+                reply_markup=reply_markup
+            )
+        else:
+            await update.message.reply_text(f"✅ {key} No numbers closed")
 
     except Exception as e:
         logger.error(f"Error in numclose: {str(e)}")
         await update.message.reply_text("❌ Error processing numbers. Please check your input.")
 
+async def answer_admin_query(query, tenant) -> bool:
+    """Answer a button press; anyone but the admin gets an alert and the message is left as it is."""
+    if query.from_user.id != tenant.admin_id:
+        await query.answer("❌ Admin only action", show_alert=True)
+        return False
+    await query.answer()
+    return True
+
 async def numclose_delete_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
-    
-    global closed_numbers
-    closed_numbers = set()
-    await query.edit_message_text("✅ All closed numbers have been cleared")
+    if not await answer_admin_query(query, tenant):
+        return
+
+    # Buttons sent before closed numbers were per draw carry no date
+    _, _, date_key = query.data.partition(":")
+    date_key = date_key or get_current_date_key()
+    apply_closed_numbers(date_key, ())
+    await query.edit_message_text(f"✅ All closed numbers for {date_key} have been cleared")
+
+# ==================== Limit alerts ====================
+async def send_limit_alert(tenant, tg_bot, pending):
+    """Tell the tenant's admin which numbers are over the break limit, as they stand now."""
+    if tenant.admin_id is None:
+        return False
+    lines = []
+    for date_key in sorted(pending):
+        ledger_data = tenant.ledger.get(date_key)
+        if ledger_data is None or ledger_data.limit is None:
+            continue
+        over = [num for num in sorted(pending[date_key]) if num in ledger_data.over]
+        if over:
+            lines.append(f"⚠️ {date_key} Limit ({ledger_data.limit}) ကျော်ဂဏန်းများ:")
+            lines.extend(f"{num:02d} ➤ {ledger_data[num]} (+{ledger_data[num] - ledger_data.limit})" for num in over)
+    if not lines:
+        return False
+    lines.append("👉 /overbuy [ကာဒိုင်အမည်]")
+    await outbound.send_lines(tg_bot, tenant.admin_id, lines)
+    return True
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     try:
         user = update.effective_user
         text = update.message.text
@@ -276,11 +684,11 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Check if admin is posting for another user
         target_username = None
-        if user.id == admin_id and text.startswith('@'):
+        if user.id == tenant.admin_id and text.startswith('@'):
             lines = text.split('\n')
             if len(lines) > 1:
                 possible_username = lines[0].strip()[1:]  # Remove @
-                if possible_username in user_data:  # Check if valid username
+                if possible_username in tenant.user_data:  # Check if valid username
                     target_username = possible_username
                     text = '\n'.join(lines[1:])  # Remove first line (@username)
                 else:
@@ -291,7 +699,19 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         username = target_username if target_username else user.username
 
         key = get_current_date_key()
-        if not date_control.get(key, False):
+        slip = None
+        crossed = []
+        async with tenant.draw_locks(key):
+            # Open state, closed numbers and the ledger are read and updated together
+            is_open = tenant.date_control.get(key, False)
+            if is_open and text:
+                slip = parse_slip(text, tenant.closed_numbers.get(key, 0))
+                if slip.bets:
+                    slip_id = next(tenant.slip_ids)
+                    crossed = apply_bets(username, key, slip_id, slip.bets)
+                    tenant.message_store.put((user.id, update.message.message_id), key, username, slip_id)
+
+        if not is_open:
             await update.message.reply_text("❌ စာရင်းပိတ်ထားပါသည်")
             return
 
@@ -299,237 +719,34 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("⚠️ မက်ဆေ့ဂျ်မရှိပါ")
             return
 
-        lines = text.split('\n')
-        all_bets = []
-        total_amount = 0
-        blocked_bets = []
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Check for wheel cases
-            if 'အခွေ' in line or 'အပူးပါအခွေ' in line:
-                if 'အခွေ' in line:
-                    parts = line.split('အခွေ')
-                    base_part = parts[0]
-                    amount_part = parts[1]
-                else:
-                    parts = line.split('အပူးပါအခွေ')
-                    base_part = parts[0]
-                    amount_part = parts[1]
-                
-                base_numbers = ''.join([c for c in base_part if c.isdigit()])
-                amount = int(''.join([c for c in amount_part if c.isdigit()]))
-                
-                pairs = []
-                for i in range(len(base_numbers)):
-                    for j in range(len(base_numbers)):
-                        if i != j:
-                            num = int(base_numbers[i] + base_numbers[j])
-                            if num not in pairs:
-                                pairs.append(num)
-                
-                if 'အပူးပါအခွေ' in line:
-                    for d in base_numbers:
-                        double = int(d + d)
-                        if double not in pairs:
-                            pairs.append(double)
-                
-                for num in pairs:
-                    if num in closed_numbers:
-                        blocked_bets.append(f"{num:02d}-{amount}")
-                    else:
-                        all_bets.append(f"{num:02d}-{amount}")
-                        total_amount += amount
-                continue
-
-            # Check for special cases
-            special_cases = {
-                "အပူး": [0, 11, 22, 33, 44, 55, 66, 77, 88, 99],
-                "ပါဝါ": [5, 16, 27, 38, 49, 50, 61, 72, 83, 94],
-                "နက္ခ": [7, 18, 24, 35, 42, 53, 69, 70, 81, 96],
-                "ညီကို": [1, 12, 23, 34, 45, 56, 67, 78, 89, 90],
-                "ကိုညီ": [9, 10, 21, 32, 43, 54, 65, 76, 87, 98],
-            }
-
-            dynamic_types = ["ထိပ်", "ပိတ်", "ဘရိတ်", "အပါ"]
-            
-            found_special = False
-            for case_name, case_numbers in special_cases.items():
-                case_variations = [case_name]
-                if case_name == "နက္ခ":
-                    case_variations.extend(["နခ", "နက်ခ", "နတ်ခ", "နခက်", "နတ်ခက်", "နက်ခက်", "နတ်ခတ်", "နက်ခတ်", "နခတ်", "နခပ်"])
-                
-                for variation in case_variations:
-                    if line.startswith(variation):
-                        amount_str = line[len(variation):].strip()
-                        amount_str = ''.join([c for c in amount_str if c.isdigit()])
-                        
-                        if amount_str and int(amount_str) >= 100:
-                            amt = int(amount_str)
-                            for num in case_numbers:
-                                if num in closed_numbers:
-                                    blocked_bets.append(f"{num:02d}-{amt}")
-                                else:
-                                    all_bets.append(f"{num:02d}-{amt}")
-                                    total_amount += amt
-                            found_special = True
-                            break
-                    if found_special:
-                        break
-                if found_special:
-                    break
-            
-            if found_special:
-                continue
-
-            for dtype in dynamic_types:
-                if dtype in line:
-                    numbers = []
-                    amount = 0
-                    
-                    parts = re.findall(r'\d+', line)
-                    if parts:
-                        amount = int(parts[-1]) if int(parts[-1]) >= 100 else 0
-                        digits = [int(p) for p in parts[:-1] if len(p) == 1 and p.isdigit()]
-                    
-                    if amount >= 100 and digits:
-                        numbers = []
-                        if dtype == "ထိပ်":
-                            for d in digits:
-                                numbers.extend([d * 10 + j for j in range(10)])
-                        elif dtype == "ပိတ်":
-                            for d in digits:
-                                numbers.extend([j * 10 + d for j in range(10)])
-                        elif dtype == "ဘရိတ်":
-                            for d in digits:
-                                numbers.extend([n for n in range(100) if (n//10 + n%10) % 10 == d])
-                        elif dtype == "အပါ":
-                            for d in digits:
-                                tens = [d * 10 + j for j in range(10)]
-                                units = [j * 10 + d for j in range(10)]
-                                numbers.extend(list(set(tens + units)))
-                        
-                        for num in numbers:
-                            if num in closed_numbers:
-                                blocked_bets.append(f"{num:02d}-{amount}")
-                            else:
-                                all_bets.append(f"{num:02d}-{amount}")
-                                total_amount += amount
-                        found_special = True
-                        break
-            
-            if found_special:
-                continue
-
-            if 'r' in line.lower():
-                r_pos = line.lower().find('r')
-                before_r = line[:r_pos]
-                after_r = line[r_pos+1:]
-                
-                nums_before = re.findall(r'\d+', before_r)
-                nums_before = [int(n) for n in nums_before if 0 <= int(n) <= 99]
-                
-                amounts = re.findall(r'\d+', after_r)
-                amounts = [int(a) for a in amounts if int(a) >= 100]
-                
-                if nums_before and amounts:
-                    if len(amounts) == 1:
-                        for num in nums_before:
-                            if num in closed_numbers:
-                                blocked_bets.append(f"{num:02d}-{amounts[0]}")
-                            else:
-                                all_bets.append(f"{num:02d}-{amounts[0]}")
-                                total_amount += amounts[0]
-                            
-                            rev_num = reverse_number(num)
-                            if rev_num in closed_numbers:
-                                blocked_bets.append(f"{rev_num:02d}-{amounts[0]}")
-                            else:
-                                all_bets.append(f"{rev_num:02d}-{amounts[0]}")
-                                total_amount += amounts[0]
-                    else:
-                        for num in nums_before:
-                            if num in closed_numbers:
-                                blocked_bets.append(f"{num:02d}-{amounts[0]}")
-                            else:
-                                all_bets.append(f"{num:02d}-{amounts[0]}")
-                                total_amount += amounts[0]
-                            
-                            rev_num = reverse_number(num)
-                            if rev_num in closed_numbers:
-                                blocked_bets.append(f"{rev_num:02d}-{amounts[1]}")
-                            else:
-                                all_bets.append(f"{rev_num:02d}-{amounts[1]}")
-                                total_amount += amounts[1]
-                    continue
-
-            numbers = []
-            amount = 0
-            
-            all_numbers = re.findall(r'\d+', line)
-            if all_numbers:
-                if int(all_numbers[-1]) >= 100:
-                    amount = int(all_numbers[-1])
-                    numbers = [int(n) for n in all_numbers[:-1] if 0 <= int(n) <= 99]
-                else:
-                    for i in range(len(all_numbers)-1):
-                        if 0 <= int(all_numbers[i]) <= 99 and int(all_numbers[i+1]) >= 100:
-                            numbers.append(int(all_numbers[i]))
-                            amount = int(all_numbers[i+1])
-                            break
-            
-            if amount >= 100 and numbers:
-                for num in numbers:
-                    if num in closed_numbers:
-                        blocked_bets.append(f"{num:02d}-{amount}")
-                    else:
-                        all_bets.append(f"{num:02d}-{amount}")
-                        total_amount += amount
-
-        if not all_bets and not blocked_bets:
+        if not slip.bets and not slip.blocked:
             await update.message.reply_text("⚠️ အချက်အလက်များကိုစစ်ဆေးပါ\nဥပမာ: 12-1000,12/34-1000 \n 12r1000,12r1000-500")
             return
 
-        if username not in user_data:
-            user_data[username] = {}
-        if key not in user_data[username]:
-            user_data[username][key] = []
-
-        if key not in ledger:
-            ledger[key] = {}
-
-        for bet in all_bets:
-            num, amt = bet.split('-')
-            num = int(num)
-            amt = int(amt)
-            
-            if num not in ledger[key]:
-                ledger[key][num] = 0
-            ledger[key][num] += amt
-            
-            user_data[username][key].append((num, amt))
+        metrics.observe_slip(len(slip.bets))
+        tenant.slips += 1
+        if crossed:
+            tenant.limit_alerts.notify(context.bot, key, crossed)
 
         response_parts = []
-        if all_bets:
-            response_parts.append("\n".join(all_bets))
-            response_parts.append(f"စုစုပေါင်း {total_amount} ကျပ်")
+        if slip.bets:
+            response_parts.append(slip.bets.render())
+            response_parts.append(f"စုစုပေါင်း {slip.total_amount} ကျပ်")
         
-        if blocked_bets:
-            blocked_nums = ", ".join(set(bet.split('-')[0] for bet in blocked_bets))
+        if slip.blocked:
+            blocked_nums = ", ".join(sorted({f"{num:02d}" for num in slip.blocked.nums}))
             response_parts.append(f"\n🚫 ပိတ်ထားသောဂဏန်းများ: {blocked_nums} (မရပါ)")
 
-        keyboard = [[InlineKeyboardButton("🗑 Delete", callback_data=f"delete:{user.id}:{update.message.message_id}:{key}")]]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # A slip whose numbers were all closed took no slip id, so it has nothing to delete
+        reply_markup = None
+        if slip.bets:
+            keyboard = [[InlineKeyboardButton("🗑 Delete", callback_data=f"delete:{user.id}:{update.message.message_id}:{key}")]]
+            reply_markup = InlineKeyboardMarkup(keyboard)
         
-        sent_message = await update.message.reply_text(
+        await update.message.reply_text(
             "\n".join(response_parts),
             reply_markup=reply_markup
         )
-        
-        message_store[(user.id, update.message.message_id)] = (sent_message.message_id, all_bets, total_amount, key)
             
     except Exception as e:
         logger.error(f"Error in handle_message: {str(e)}")
@@ -537,19 +754,16 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         
 async def delete_bet(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         _, user_id_str, message_id_str, date_key = query.data.split(':')
         user_id = int(user_id_str)
         message_id = int(message_id_str)
-        
-        # Only admin can interact with delete button
-        if query.from_user.id != admin_id:
-            await query.edit_message_text("❌ Admin only action")
-            return
-            
+
         keyboard = [
             [InlineKeyboardButton("✅ OK", callback_data=f"confirm_delete:{user_id}:{message_id}:{date_key}")],
             [InlineKeyboardButton("❌ Cancel", callback_data=f"cancel_delete:{user_id}:{message_id}:{date_key}")]
@@ -562,79 +776,51 @@ async def delete_bet(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("❌ Error occurred while processing deletion")
 
 async def confirm_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         _, user_id_str, message_id_str, date_key = query.data.split(':')
         user_id = int(user_id_str)
         message_id = int(message_id_str)
         
-        if (user_id, message_id) not in message_store:
-            await query.edit_message_text("❌ ဒေတာမတွေ့ပါ")
-            return
-            
-        sent_message_id, bets, total_amount, _ = message_store[(user_id, message_id)]
-        
-        username = None
-        for uname, data in user_data.items():
-            if date_key in data:
-                for bet in data[date_key]:
-                    num, amt = bet
-                    if f"{num:02d}-{amt}" in bets:
-                        username = uname
-                        break
-                if username:
-                    break
-        
-        if not username:
-            await query.edit_message_text("❌ User မတွေ့ပါ")
-            return
-        
-        for bet in bets:
-            num, amt = bet.split('-')
-            num = int(num)
-            amt = int(amt)
-            
-            if date_key in ledger and num in ledger[date_key]:
-                ledger[date_key][num] -= amt
-                if ledger[date_key][num] <= 0:
-                    del ledger[date_key][num]
-                # Remove date from ledger if empty
-                if not ledger[date_key]:
-                    del ledger[date_key]
-            
-            if username in user_data and date_key in user_data[username]:
-                user_data[username][date_key] = [
-                    (n, a) for n, a in user_data[username][date_key] 
-                    if not (n == num and a == amt)
-                ]
-                
-                if not user_data[username][date_key]:
-                    del user_data[username][date_key]
-                    if not user_data[username]:
-                        del user_data[username]
-        
-        del message_store[(user_id, message_id)]
-        
-        await query.edit_message_text("✅ လောင်းကြေးဖျက်ပြီးပါပြီ")
+        # Held until the message is edited, so a double tap waits and then finds nothing to delete
+        async with tenant.draw_locks(date_key):
+            ref = tenant.message_store.get((user_id, message_id))
+            if ref is None:
+                await query.edit_message_text("❌ ဒေတာမတွေ့ပါ")
+                return
+
+            if apply_delete(ref.username, ref.date_key, ref.slip_id) is None:
+                await query.edit_message_text("❌ User မတွေ့ပါ")
+                return
+
+            tenant.message_store.pop((user_id, message_id))
+
+            await query.edit_message_text("✅ လောင်းကြေးဖျက်ပြီးပါပြီ")
         
     except Exception as e:
         logger.error(f"Error in confirm_delete: {str(e)}")
         await query.edit_message_text("❌ Error occurred while deleting bet")
 
 async def cancel_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         _, user_id_str, message_id_str, date_key = query.data.split(':')
         user_id = int(user_id_str)
         message_id = int(message_id_str)
         
-        if (user_id, message_id) in message_store:
-            sent_message_id, bets, total_amount, _ = message_store[(user_id, message_id)]
-            response = "\n".join(bets) + f"\nစုစုပေါင်း {total_amount} ကျပ်"
+        ref = tenant.message_store.get((user_id, message_id))
+        book = tenant.user_data.get(ref.username, {}).get(ref.date_key) if ref else None
+        bets = book.slips.get(ref.slip_id) if book else None
+        if bets is not None:
+            response = bets.render() + f"\nစုစုပေါင်း {bets.total()} ကျပ်"
             keyboard = [[InlineKeyboardButton("🗑 Delete", callback_data=f"delete:{user_id}:{message_id}:{date_key}")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
             await query.edit_message_text(response, reply_markup=reply_markup)
@@ -646,88 +832,67 @@ async def cancel_delete(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("❌ Error occurred while canceling deletion")
 
 async def ledger_summary(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, current_working_date, closed_numbers
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
-        date_key = current_working_date if current_working_date else get_current_date_key()
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
+        closed = tenant.closed_numbers.get(date_key, 0)
         
-        if date_key not in ledger:
+        if date_key not in tenant.ledger:
             await update.message.reply_text(f"ℹ️ {date_key} အတွက် လက်ရှိတွင် လောင်းကြေးမရှိပါ")
             return
             
-        lines = [f"📒 {date_key} လက်ကျန်ငွေစာရင်း"]
-        ledger_data = ledger[date_key]
-        
-        total_all_numbers = 0
-        
-        for i in range(100):
-            total = ledger_data.get(i, 0)
-            if total > 0:
-                if date_key in pnumber_per_date and i == pnumber_per_date[date_key]:
-                    lines.append(f"🔴 {i:02d} ➤ {total} 🔴")
-                elif i in closed_numbers:
-                    lines.append(f"🚫 {i:02d} ➤ {total} (Closed)")
-                else:
-                    lines.append(f"{i:02d} ➤ {total}")
-                total_all_numbers += total
+        key = (date_key, "ledger", None)
+        version = tenant.draw_snapshots.version(date_key)
+        lines = tenant.render_cache.get(key, version)
+        if lines is None:
+            lines = build_packed(ledger_lines, tenant.draw_snapshots.get(date_key), closed)
+            tenant.render_cache.put(key, version, lines)
 
-        if len(lines) == 1:
-            await update.message.reply_text(f"ℹ️ {date_key} အတွက် လက်ရှိတွင် လောင်းကြေးမရှိပါ")
+        if lines:
+            await outbound.reply_lines(update, context, lines)
         else:
-            if date_key in pnumber_per_date:
-                pnum = pnumber_per_date[date_key]
-                lines.append(f"\n🔴 Power Number: {pnum:02d} ➤ {ledger_data.get(pnum, 0)}")
-            
-            if closed_numbers:
-                closed_str = " ".join(f"{n:02d}" for n in sorted(closed_numbers))
-                lines.append(f"\n🔒 Closed Numbers: {closed_str}")
-            
-            lines.append(f"\n💰 စုစုပေါင်း: {total_all_numbers} ကျပ်")
-            await update.message.reply_text("\n".join(lines))
+            await update.message.reply_text(f"ℹ️ {date_key} အတွက် လက်ရှိတွင် လောင်းကြေးမရှိပါ")
     except Exception as e:
         logger.error(f"Error in ledger: {str(e)}")
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
         
 async def break_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, break_limits, current_working_date
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
         # Determine which date to work on
-        date_key = current_working_date if current_working_date else get_current_date_key()
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
             
         if not context.args:
-            if date_key in break_limits:
-                await update.message.reply_text(f"ℹ️ Usage: /break [limit]\nℹ️ လက်ရှိတွင် break limit: {break_limits[date_key]}")
+            if date_key in tenant.break_limits:
+                await update.message.reply_text(f"ℹ️ Usage: /break [limit]\nℹ️ လက်ရှိတွင် break limit: {tenant.break_limits[date_key]}")
             else:
                 await update.message.reply_text(f"ℹ️ Usage: /break [limit]\nℹ️ {date_key} အတွက် break limit မသတ်မှတ်ရသေးပါ")
             return
             
         try:
             new_limit = int(context.args[0])
-            break_limits[date_key] = new_limit
+            apply_break_limit(date_key, new_limit)
             await update.message.reply_text(f"✅ {date_key} အတွက် Break limit ကို {new_limit} အဖြစ်သတ်မှတ်ပြီးပါပြီ")
             
-            if date_key not in ledger:
+            if date_key not in tenant.ledger:
                 await update.message.reply_text(f"ℹ️ {date_key} အတွက် လောင်းကြေးမရှိသေးပါ")
                 return
                 
-            ledger_data = ledger[date_key]
+            over_numbers = tenant.ledger[date_key].over_limit()
             msg = [f"📌 {date_key} အတွက် Limit ({new_limit}) ကျော်ဂဏန်းများ:"]
-            found = False
-            
-            for num, amt in ledger_data.items():
-                if amt > new_limit:
-                    msg.append(f"{num:02d} ➤ {amt - new_limit}")
-                    found = True
+            for num, amt in over_numbers.items():
+                msg.append(f"{num:02d} ➤ {amt}")
             
-            if not found:
+            if not over_numbers:
                 await update.message.reply_text(f"ℹ️ {date_key} အတွက် ဘယ်ဂဏန်းမှ limit ({new_limit}) မကျော်ပါ")
             else:
                 await update.message.reply_text("\n".join(msg))
@@ -740,24 +905,24 @@ async def break_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 async def overbuy(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, break_limits, current_working_date
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
         # Determine which date to work on
-        date_key = current_working_date if current_working_date else get_current_date_key()
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
             
         if not context.args:
             await update.message.reply_text("ℹ️ /overbuy ကာဒိုင်အမည်ထည့်ပါ")
             return
             
-        if date_key not in break_limits:
+        if date_key not in tenant.break_limits:
             await update.message.reply_text(f"⚠️ {date_key} အတွက် ကျေးဇူးပြု၍ /break [limit] ဖြင့် limit သတ်မှတ်ပါ")
             return
             
-        if date_key not in ledger:
+        if date_key not in tenant.ledger:
             await update.message.reply_text(f"ℹ️ {date_key} အတွက် လောင်းကြေးမရှိသေးပါ")
             return
             
@@ -765,165 +930,121 @@ async def overbuy(update: Update, context: ContextTypes.DEFAULT_TYPE):
         context.user_data['overbuy_username'] = username
         context.user_data['overbuy_date'] = date_key
         
-        ledger_data = ledger[date_key]
-        break_limit_val = break_limits[date_key]
-        over_numbers = {num: amt - break_limit_val for num, amt in ledger_data.items() if amt > break_limit_val}
+        break_limit_val = tenant.break_limits[date_key]
+        over_numbers = tenant.ledger[date_key].over_limit()
         
         if not over_numbers:
             await update.message.reply_text(f"ℹ️ {date_key} အတွက် ဘယ်ဂဏန်းမှ limit ({break_limit_val}) မကျော်ပါ")
             return
             
-        if date_key not in overbuy_selections:
-            overbuy_selections[date_key] = {}
-        overbuy_selections[date_key][username] = over_numbers.copy()
-        
-        msg = [f"{username} ထံမှာတင်ရန်များ (Date: {date_key}, Limit: {break_limit_val}):"]
-        buttons = []
-        for num, amt in over_numbers.items():
-            buttons.append([InlineKeyboardButton(f"{num:02d} ➤ {amt} {'✅' if num in overbuy_selections[date_key][username] else '⬜'}", 
-                          callback_data=f"overbuy_select:{num}")])
-        
-        buttons.append([
-            InlineKeyboardButton("Select All", callback_data="overbuy_select_all"),
-            InlineKeyboardButton("Unselect All", callback_data="overbuy_unselect_all")
-        ])
-        buttons.append([InlineKeyboardButton("OK", callback_data="overbuy_confirm")])
+        if date_key not in tenant.overbuy_selections:
+            tenant.overbuy_selections[date_key] = {}
+        tenant.overbuy_selections[date_key][username] = over_numbers.copy()
         
-        reply_markup = InlineKeyboardMarkup(buttons)
-        await update.message.reply_text("\n".join(msg), reply_markup=reply_markup)
+        keyboard = SelectionKeyboard(
+            f"{username} ထံမှာတင်ရန်များ (Date: {date_key}, Limit: {break_limit_val}):",
+            "overbuy_select", "overbuy_page",
+            [(num, f"{num:02d} ➤ {amt}") for num, amt in over_numbers.items()],
+            OVERBUY_FOOTER, selected=over_numbers,
+        )
+        context.user_data['overbuy_keyboard'] = keyboard
+        await keyboard.reply(update.message)
         
     except Exception as e:
         logger.error(f"Error in overbuy: {str(e)}")
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 async def overbuy_select(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         _, num_str = query.data.split(':')
         num = int(num_str)
         username = context.user_data.get('overbuy_username')
         date_key = context.user_data.get('overbuy_date')
+        keyboard = context.user_data.get('overbuy_keyboard')
         
-        if not username or not date_key:
+        if not username or not date_key or keyboard is None:
             await query.edit_message_text("❌ Error: User or date not found")
             return
             
-        if date_key not in overbuy_selections or username not in overbuy_selections[date_key]:
+        if date_key not in tenant.overbuy_selections or username not in tenant.overbuy_selections[date_key]:
             await query.edit_message_text("❌ Error: Selection data not found")
             return
             
-        if num in overbuy_selections[date_key][username]:
-            del overbuy_selections[date_key][username][num]
+        if keyboard.toggle(num):
+            break_limit_val = tenant.break_limits[date_key]
+            tenant.overbuy_selections[date_key][username][num] = tenant.ledger[date_key][num] - break_limit_val
         else:
-            break_limit_val = break_limits[date_key]
-            overbuy_selections[date_key][username][num] = ledger[date_key][num] - break_limit_val
+            tenant.overbuy_selections[date_key][username].pop(num, None)
             
-        msg = [f"{username} ထံမှာတင်ရန်များ (Date: {date_key}):"]
-        buttons = []
-        for n, amt in overbuy_selections[date_key][username].items():
-            buttons.append([InlineKeyboardButton(f"{n:02d} ➤ {amt} {'✅' if n in overbuy_selections[date_key][username] else '⬜'}", 
-                          callback_data=f"overbuy_select:{n}")])
-        
-        buttons.append([
-            InlineKeyboardButton("Select All", callback_data="overbuy_select_all"),
-            InlineKeyboardButton("Unselect All", callback_data="overbuy_unselect_all")
-        ])
-        buttons.append([InlineKeyboardButton("OK", callback_data="overbuy_confirm")])
-        
-        reply_markup = InlineKeyboardMarkup(buttons)
-        await query.edit_message_text("\n".join(msg), reply_markup=reply_markup)
+        await keyboard.refresh(query)
         
     except Exception as e:
         logger.error(f"Error in overbuy_select: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
 async def overbuy_select_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         username = context.user_data.get('overbuy_username')
         date_key = context.user_data.get('overbuy_date')
+        keyboard = context.user_data.get('overbuy_keyboard')
         
-        if not username or not date_key:
+        if not username or not date_key or keyboard is None:
             await query.edit_message_text("❌ Error: User or date not found")
             return
             
-        if date_key not in overbuy_selections:
-            overbuy_selections[date_key] = {}
+        if date_key not in tenant.overbuy_selections:
+            tenant.overbuy_selections[date_key] = {}
             
-        break_limit_val = break_limits[date_key]
-        ledger_data = ledger[date_key]
-        overbuy_selections[date_key][username] = {
-            num: amt - break_limit_val 
-            for num, amt in ledger_data.items() 
-            if amt > break_limit_val
-        }
-        
-        msg = [f"{username} ထံမှာတင်ရန်များ (Date: {date_key}):"]
-        buttons = []
-        for num, amt in overbuy_selections[date_key][username].items():
-            buttons.append([InlineKeyboardButton(f"{num:02d} ➤ {amt} ✅", 
-                          callback_data=f"overbuy_select:{num}")])
-        
-        buttons.append([
-            InlineKeyboardButton("Select All", callback_data="overbuy_select_all"),
-            InlineKeyboardButton("Unselect All", callback_data="overbuy_unselect_all")
-        ])
-        buttons.append([InlineKeyboardButton("OK", callback_data="overbuy_confirm")])
-        
-        reply_markup = InlineKeyboardMarkup(buttons)
-        await query.edit_message_text("\n".join(msg), reply_markup=reply_markup)
+        over_numbers = tenant.ledger[date_key].over_limit()
+        tenant.overbuy_selections[date_key][username] = {num: over_numbers[num] for num in keyboard.keys if num in over_numbers}
+        keyboard.set_all(True)
+        await keyboard.refresh(query)
         
     except Exception as e:
         logger.error(f"Error in overbuy_select_all: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
 async def overbuy_unselect_all(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         username = context.user_data.get('overbuy_username')
         date_key = context.user_data.get('overbuy_date')
+        keyboard = context.user_data.get('overbuy_keyboard')
         
-        if not username or not date_key:
+        if not username or not date_key or keyboard is None:
             await query.edit_message_text("❌ Error: User or date not found")
             return
             
-        if date_key not in overbuy_selections:
-            overbuy_selections[date_key] = {}
+        if date_key not in tenant.overbuy_selections:
+            tenant.overbuy_selections[date_key] = {}
             
-        overbuy_selections[date_key][username] = {}
-        
-        break_limit_val = break_limits[date_key]
-        ledger_data = ledger[date_key]
-        over_numbers = {num: amt - break_limit_val for num, amt in ledger_data.items() if amt > break_limit_val}
-        
-        msg = [f"{username} ထံမှာတင်ရန်များ (Date: {date_key}):"]
-        buttons = []
-        for num, amt in over_numbers.items():
-            buttons.append([InlineKeyboardButton(f"{num:02d} ➤ {amt} ⬜", 
-                          callback_data=f"overbuy_select:{num}")])
-        
-        buttons.append([
-            InlineKeyboardButton("Select All", callback_data="overbuy_select_all"),
-            InlineKeyboardButton("Unselect All", callback_data="overbuy_unselect_all")
-        ])
-        buttons.append([InlineKeyboardButton("OK", callback_data="overbuy_confirm")])
-        
-        reply_markup = InlineKeyboardMarkup(buttons)
-        await query.edit_message_text("\n".join(msg), reply_markup=reply_markup)
+        tenant.overbuy_selections[date_key][username] = {}
+        keyboard.set_all(False)
+        await keyboard.refresh(query)
         
     except Exception as e:
         logger.error(f"Error in overbuy_unselect_all: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
 async def overbuy_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
-    await query.answer()
+    if not await answer_admin_query(query, tenant):
+        return
     
     try:
         username = context.user_data.get('overbuy_username')
@@ -933,57 +1054,176 @@ async def overbuy_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("❌ Error: User or date not found")
             return
             
-        if date_key not in overbuy_selections or username not in overbuy_selections[date_key]:
-            await query.edit_message_text("❌ Error: Selection data not found")
-            return
-            
-        selected_numbers = overbuy_selections[date_key][username]
-        if not selected_numbers:
-            await query.edit_message_text("⚠️ ဘာဂဏန်းမှမရွေးထားပါ")
-            return
-            
-        if username not in user_data:
-            user_data[username] = {}
-        if date_key not in user_data[username]:
-            user_data[username][date_key] = []
-            
-        total_amount = 0
-        bets = []
-        for num, amt in selected_numbers.items():
-            user_data[username][date_key].append((num, -amt))
-            bets.append(f"{num:02d}-{amt}")
-            total_amount += amt
-            
-            # Update ledger
-            ledger[date_key][num] = ledger[date_key].get(num, 0) - amt
-            if ledger[date_key][num] <= 0:
-                del ledger[date_key][num]
-        
-        # Initialize overbuy_list for date if needed
-        if date_key not in overbuy_list:
-            overbuy_list[date_key] = {}
-        overbuy_list[date_key][username] = selected_numbers.copy()
-        
-        response = f"{username} - {date_key}\n" + "\n".join(bets) + f"\nစုစုပေါင်း {total_amount} ကျပ်"
-        await query.edit_message_text(response)
+        async with tenant.draw_locks(date_key):
+            if date_key not in tenant.overbuy_selections or username not in tenant.overbuy_selections[date_key]:
+                await query.edit_message_text("❌ Error: Selection data not found")
+                return
+
+            if not tenant.overbuy_selections[date_key][username]:
+                await query.edit_message_text("⚠️ ဘာဂဏန်းမှမရွေးထားပါ")
+                return
+
+            # Consume the selection so a second tap cannot apply it again, and only
+            # take what is still over the limit in case another overbuy covered part of it
+            selected = tenant.overbuy_selections[date_key].pop(username)
+            over_numbers = tenant.ledger[date_key].over_limit() if date_key in tenant.ledger else {}
+            selected_numbers = {num: min(amt, over_numbers[num]) for num, amt in selected.items() if num in over_numbers}
+            if not selected_numbers:
+                await query.edit_message_text(f"ℹ️ {date_key} အတွက် ဘယ်ဂဏန်းမှ limit မကျော်တော့ပါ")
+                return
+
+            apply_overbuy(username, date_key, next(tenant.slip_ids), selected_numbers)
+
+            bets = BetBatch(selected_numbers.items())
+            total_amount = bets.total()
+            response = f"{username} - {date_key}\n" + bets.render() + f"\nစုစုပေါင်း {total_amount} ကျပ်"
+            await query.edit_message_text(response)
         
     except Exception as e:
         logger.error(f"Error in overbuy_confirm: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
+def hedge_plan_lines(date_key, plan):
+    lines = [f"ကာဒိုင်များထံ ခွဲတင်ရန် (Date: {date_key}):"]
+    for bookie, selected in plan.allocations.items():
+        bets = BetBatch(selected.items())
+        lines.append(f"{bookie} - {bets.total()} ကျပ်\n" + bets.render())
+    if plan.unplaced:
+        lines.append("⚠️ ကာဒိုင်နေရာမလောက်ပါ: " + ", ".join(f"{num:02d}-{amt}" for num, amt in plan.unplaced.items()))
+    if plan.kept:
+        lines.append("ℹ️ မတင်ဘဲထားမည်: " + ", ".join(f"{num:02d}-{amt}" for num, amt in plan.kept.items()))
+    lines.append(f"စုစုပေါင်း {plan.total()} ကျပ်")
+    return lines
+
+async def bookies(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
+    try:
+        if update.effective_user.id != tenant.admin_id:
+            await update.message.reply_text("❌ Admin only command")
+            return
+
+        if not context.args:
+            configured = "\n".join(f"{name}: {capacity if capacity else 'unlimited'}" for name, capacity in tenant.hedge_bookies)
+            await update.message.reply_text(
+                "ℹ️ Usage: /bookies [name:capacity]...\n" + (configured or "ℹ️ ကာဒိုင် မသတ်မှတ်ရသေးပါ")
+            )
+            return
+
+        try:
+            configured = parse_bookies(context.args)
+        except ValueError as e:
+            await update.message.reply_text(f"⚠️ မှားယွင်းနေသည်: {str(e)}")
+            return
+
+        apply_hedge_bookies(configured)
+        await update.message.reply_text(
+            "✅ ကာဒိုင်များ သတ်မှတ်ပြီး\n" + "\n".join(f"{name}: {capacity if capacity else 'unlimited'}" for name, capacity in configured)
+        )
+
+    except Exception as e:
+        logger.error(f"Error in bookies: {str(e)}")
+        await update.message.reply_text(f"❌ Error: {str(e)}")
+
+async def hedge(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
+    try:
+        if update.effective_user.id != tenant.admin_id:
+            await update.message.reply_text("❌ Admin only command")
+            return
+
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
+
+        if not tenant.hedge_bookies:
+            await update.message.reply_text("⚠️ ကျေးဇူးပြု၍ /bookies [name:capacity] ဖြင့် ကာဒိုင်များ သတ်မှတ်ပါ")
+            return
+
+        if date_key not in tenant.break_limits:
+            await update.message.reply_text(f"⚠️ {date_key} အတွက် ကျေးဇူးပြု၍ /break [limit] ဖြင့် limit သတ်မှတ်ပါ")
+            return
+
+        if date_key not in tenant.ledger:
+            await update.message.reply_text(f"ℹ️ {date_key} အတွက် လောင်းကြေးမရှိသေးပါ")
+            return
+
+        # Arguments override the plan per number: 12=A sends 12 to A, 34=- keeps 34
+        try:
+            pins = parse_pins(context.args)
+        except ValueError as e:
+            await update.message.reply_text(f"⚠️ မှားယွင်းနေသည်: {str(e)}\nℹ️ Usage: /hedge [num=bookie | num=-]...")
+            return
+
+        plan = plan_hedge(tenant.ledger[date_key].over_limit(), tenant.hedge_bookies,
+                          tenant.overbuy_list.get(date_key), pins)
+        if not plan.allocations:
+            lines = [f"ℹ️ {date_key} အတွက် တင်ရန်မရှိပါ"] + hedge_plan_lines(date_key, plan)[1:-1]
+            await outbound.reply_lines(update, context, lines)
+            return
+
+        context.user_data['hedge_date'] = date_key
+        context.user_data['hedge_pins'] = pins
+        reply_markup = InlineKeyboardMarkup([[
+            InlineKeyboardButton("✅ OK", callback_data="hedge_confirm"),
+            InlineKeyboardButton("❌ Cancel", callback_data="hedge_cancel"),
+        ]])
+        await outbound.reply_lines(update, context, hedge_plan_lines(date_key, plan), reply_markup=reply_markup)
+
+    except Exception as e:
+        logger.error(f"Error in hedge: {str(e)}")
+        await update.message.reply_text(f"❌ Error: {str(e)}")
+
+async def hedge_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
+    query = update.callback_query
+    if not await answer_admin_query(query, tenant):
+        return
+
+    try:
+        date_key = context.user_data.get('hedge_date')
+        if not date_key:  # already applied or cancelled from another tap
+            return
+
+        async with tenant.draw_locks(date_key):
+            # Plan again against the ledger as it is now: bets, deletes and overbuys
+            # may have landed since the plan was shown, and a second tap finds nothing
+            if context.user_data.pop('hedge_date', None) is None:
+                return
+            pins = context.user_data.pop('hedge_pins', {})
+            over_numbers = tenant.ledger[date_key].over_limit() if date_key in tenant.ledger else {}
+            plan = plan_hedge(over_numbers, tenant.hedge_bookies, tenant.overbuy_list.get(date_key), pins)
+            if not plan.allocations:
+                await query.edit_message_text(f"ℹ️ {date_key} အတွက် ဘယ်ဂဏန်းမှ limit မကျော်တော့ပါ")
+                return
+
+            apply_hedge(date_key, [(bookie, next(tenant.slip_ids), selected)
+                                   for bookie, selected in plan.allocations.items()])
+            await outbound.edit_lines(query, context, ["✅ တင်ပြီးပါပြီ"] + hedge_plan_lines(date_key, plan))
+
+    except Exception as e:
+        logger.error(f"Error in hedge_confirm: {str(e)}")
+        await query.edit_message_text("❌ Error occurred")
+
+async def hedge_cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
+    query = update.callback_query
+    if not await answer_admin_query(query, tenant):
+        return
+    context.user_data.pop('hedge_date', None)
+    context.user_data.pop('hedge_pins', None)
+    await query.edit_message_text("ℹ️ ခွဲတင်ခြင်းကိုပယ်ဖျက်လိုက်ပါပြီ")
+
 async def pnumber(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, pnumber_per_date, current_working_date
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
         # Determine which date to work on
-        date_key = current_working_date if current_working_date else get_current_date_key()
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
             
         if not context.args:
-            if date_key in pnumber_per_date:
-                await update.message.reply_text(f"ℹ️ Usage: /pnumber [number]\nℹ️ {date_key} အတွက် Power Number: {pnumber_per_date[date_key]:02d}")
+            if date_key in tenant.pnumber_per_date:
+                await update.message.reply_text(f"ℹ️ Usage: /pnumber [number]\nℹ️ {date_key} အတွက် Power Number: {tenant.pnumber_per_date[date_key]:02d}")
             else:
                 await update.message.reply_text(f"ℹ️ Usage: /pnumber [number]\nℹ️ {date_key} အတွက် Power Number မသတ်မှတ်ရသေးပါ")
             return
@@ -994,19 +1234,16 @@ async def pnumber(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 await update.message.reply_text("⚠️ ဂဏန်းကို 0 နှင့် 99 ကြားထည့်ပါ")
                 return
                 
-            pnumber_per_date[date_key] = num
+            apply_pnumber(date_key, num)
             await update.message.reply_text(f"✅ {date_key} အတွက် Power Number ကို {num:02d} အဖြစ်သတ်မှတ်ပြီး")
             
             # Show report for this date
             msg = []
             total_power = 0
             
-            for user, records in user_data.items():
+            for user, records in tenant.user_data.items():
                 if date_key in records:
-                    user_total = 0
-                    for bet_num, amt in records[date_key]:
-                        if bet_num == num:
-                            user_total += amt
+                    user_total = records[date_key].by_number[num]
                     if user_total > 0:
                         msg.append(f"{user}: {num:02d} ➤ {user_total}")
                         total_power += user_total
@@ -1025,17 +1262,17 @@ async def pnumber(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 async def comandza(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
-        if not user_data:
+        if not tenant.user_data:
             await update.message.reply_text("ℹ️ လက်ရှိ user မရှိပါ")
             return
             
-        users = list(user_data.keys())
+        users = list(tenant.user_data.keys())
         keyboard = [[InlineKeyboardButton(u, callback_data=f"comza:{u}")] for u in users]
         await update.message.reply_text("👉 User ကိုရွေးပါ", reply_markup=InlineKeyboardMarkup(keyboard))
     except Exception as e:
@@ -1052,11 +1289,28 @@ async def comza_input(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error in comza_input: {str(e)}")
         await query.edit_message_text(f"❌ Error: {str(e)}")
 
+class ComzaPending(filters.UpdateFilter):
+    """Text from a user who picked an agent in /comandza and has not sent its com/za yet.
+
+    Only these messages go to comza_text; every other text, slips included,
+    falls through to handle_message. ``user_data`` is the Application's
+    user_data, which TenantContext splits by tenant.
+    """
+
+    def __init__(self, user_data):
+        super().__init__(name="ComzaPending")
+        self.user_data = user_data
+
+    def filter(self, update):
+        if update.effective_user is None:
+            return False
+        data = self.user_data.get(update.effective_user.id, {})
+        return 'selected_user' in data.get(tenants.key_of(update), {})
+
 async def comza_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
         user = context.user_data.get('selected_user')
         if not user:
-            await handle_message(update, context)
             return
             
         text = update.message.text
@@ -1072,8 +1326,7 @@ async def comza_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 if com < 0 or com > 100 or za < 0:
                     raise ValueError
                     
-                com_data[user] = com
-                za_data[user] = za
+                apply_comza(user, com, za)
                 del context.user_data['selected_user']
                 await update.message.reply_text(f"✅ Com {com}%, Za {za} မှတ်ထားပြီး")
             except:
@@ -1085,63 +1338,28 @@ async def comza_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 async def total(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, current_working_date
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
         # Determine which date to work on
-        date_key = current_working_date if current_working_date else get_current_date_key()
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
             
-        if date_key not in pnumber_per_date:
+        if date_key not in tenant.pnumber_per_date:
             await update.message.reply_text(f"⚠️ {date_key} အတွက် ကျေးဇူးပြု၍ /pnumber [number] ဖြင့် Power Number သတ်မှတ်ပါ")
             return
             
-        if not user_data:
+        if not tenant.user_data:
             await update.message.reply_text("ℹ️ လက်ရှိစာရင်းမရှိပါ")
             return
             
-        pnum = pnumber_per_date[date_key]
-        msg = [f"📊 {date_key} အတွက် စုပေါင်းရလဒ်"]
-        total_net = 0
-        
-        for user, records in user_data.items():
-            if date_key in records:
-                user_total_amt = 0
-                user_pamt = 0
-                
-                for num, amt in records[date_key]:
-                    user_total_amt += amt
-                    if num == pnum:
-                        user_pamt += amt
-                
-                com = com_data.get(user, 0)
-                za = za_data.get(user, 0)
-                
-                commission_amt = (user_total_amt * com) // 100
-                after_com = user_total_amt - commission_amt
-                win_amt = user_pamt * za
-                
-                net = after_com - win_amt
-                status = "ဒိုင်ကပေးရမည်" if net < 0 else "ဒိုင်ကရမည်"
-                
-                user_report = (
-                    f"👤 {user}\n"
-                    f"💵 စုစုပေါင်း: {user_total_amt}\n"
-                    f"📊 Com({com}%) ➤ {commission_amt}\n"
-                    f"💰 Com ပြီး: {after_com}\n"
-                    f"🔢 Power Number({pnum:02d}) ➤ {user_pamt}\n"
-                    f"🎯 Za({za}) ➤ {win_amt}\n"
-                    f"📈 ရလဒ်: {abs(net)} ({status})\n"
-                    "-----------------"
-                )
-                msg.append(user_report)
-                total_net += net
-
-        if len(msg) > 1:
-            msg.append(f"\n📊 စုစုပေါင်းရလဒ်: {abs(total_net)} ({'ဒိုင်အရှုံး' if total_net < 0 else 'ဒိုင်အမြတ်'})")
-            await update.message.reply_text("\n".join(msg))
+        msg = await report_pool.lines(total_lines, tenant.draw_snapshots.get(date_key), list(tenant.user_data),
+                                      dict(tenant.com_data), dict(tenant.za_data))
+
+        if msg:
+            await outbound.reply_lines(update, context, msg)
         else:
             await update.message.reply_text(f"ℹ️ {date_key} အတွက် ဒေတာမရှိပါ")
     except Exception as e:
@@ -1149,44 +1367,34 @@ async def total(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 async def tsent(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, current_working_date
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
         # Determine which date to work on
-        date_key = current_working_date if current_working_date else get_current_date_key()
+        date_key = tenant.current_working_date if tenant.current_working_date else get_current_date_key()
             
-        if not user_data:
+        if not tenant.user_data:
             await update.message.reply_text("ℹ️ လက်ရှိ user မရှိပါ")
             return
             
-        for user in user_data:
-            if date_key in user_data[user]:
-                user_report = [f"👤 {user} - {date_key}:"]
-                total_amt = 0
-                
-                for num, amt in user_data[user][date_key]:
-                    user_report.append(f"  - {num:02d} ➤ {amt}")
-                    total_amt += amt
-                
-                user_report.append(f"💵 စုစုပေါင်း: {total_amt}")
-                await update.message.reply_text("\n".join(user_report))
-        
-        await update.message.reply_text(f"✅ {date_key} အတွက် စာရင်းများအားလုံး ပေးပို့ပြီးပါပြီ")
+        # One block per user; blocks are packed into as few messages as fit
+        reports = await report_pool.lines(tsent_lines, tenant.draw_snapshots.get(date_key), list(tenant.user_data))
+        await outbound.reply_lines(update, context, reports)
     except Exception as e:
         logger.error(f"Error in tsent: {str(e)}")
         await update.message.reply_text(f"❌ Error: {str(e)}")
         
 async def alldata(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
-        if not user_data:
+        if not tenant.user_data:
             await update.message.reply_text("ℹ️ လက်ရှိစာရင်းမရှိပါ")
             return
             
@@ -1194,9 +1402,9 @@ async def alldata(update: Update, context: ContextTypes.DEFAULT_TYPE):
         msg = ["📊 **စာရင်းသွင်းထားသော User များ**"]
         msg.append("⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯")
         
-        for user in user_data.keys():
-            com = com_data.get(user, 0)  # Default 0% if not set
-            za = za_data.get(user, 80)   # Default 80 if not set
+        for user in tenant.user_data.keys():
+            com = tenant.com_data.get(user, 0)  # Default 0% if not set
+            za = tenant.za_data.get(user, 80)   # Default 80 if not set
             msg.append(f"👤 **{user}**\n   - Com: {com}%\n   - Za: {za}x")
         
         
@@ -1232,12 +1440,7 @@ async def handle_new_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
         za = int(za_str)
         
         
-        if username not in user_data:
-            user_data[username] = {}
-        
-        
-        com_data[username] = com
-        za_data[username] = za
+        apply_add_user(username, com, za)
         
         await update.message.reply_text(
             f"✅ User အသစ်ထည့်ပြီးပါပြီ!\n"
@@ -1254,42 +1457,45 @@ async def handle_new_user(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("❌ Error! ဖော်မတ်မှားနေပါသည်။ ဥပမာ: `မမ@15@80`")
 
 async def reset_data(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id, user_data, ledger, za_data, com_data, date_control, overbuy_list
-    global overbuy_selections, break_limits, pnumber_per_date, current_working_date, closed_numbers
+    tenant = tenants.current()
     
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
-        user_data = {}
-        ledger = {}
-        za_data = {}
-        com_data = {}
-        date_control = {}
-        overbuy_list = {}
-        overbuy_selections = {}
-        break_limits = {}
-        pnumber_per_date = {}
-        closed_numbers = set()
-        current_working_date = get_current_date_key()
+        async with tenant.draw_locks.hold_all(tenant.draw_locks.known()):
+            apply_reset()
+        tenant.current_working_date = get_current_date_key()
         
         await update.message.reply_text("✅ ဒေတာများအားလုံးကို ပြန်လည်သုတ်သင်ပြီး လက်ရှိနေ့သို့ပြန်လည်သတ်မှတ်ပြီးပါပြီ")
     except Exception as e:
         logger.error(f"Error in reset_data: {str(e)}")
         await update.message.reply_text(f"❌ Error: {str(e)}")
         
+async def posthis_report(username, date_key, dates):
+    """Packed /posthis for ``dates``, from the render cache while none of them has changed."""
+    tenant = tenants.current()
+    key = (date_key, "posthis", username)
+    version = tuple((d, tenant.draw_snapshots.version(d)) for d in dates)
+    msg = tenant.render_cache.get(key, version)
+    if msg is None:
+        msg = await report_pool.lines(history_lines, username, [tenant.draw_snapshots.get(d) for d in dates])
+        tenant.render_cache.put(key, version, msg)
+    return msg
+
 async def posthis(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     try:
         user = update.effective_user
-        is_admin = user.id == admin_id
+        is_admin = user.id == tenant.admin_id
         
         if is_admin and not context.args:
-            if not user_data:
+            if not tenant.user_data:
                 await update.message.reply_text("ℹ️ လက်ရှိ user မရှိပါ")
                 return
                 
-            keyboard = [[InlineKeyboardButton(u, callback_data=f"posthis:{u}")] for u in user_data.keys()]
+            keyboard = [[InlineKeyboardButton(u, callback_data=f"posthis:{u}")] for u in tenant.user_data.keys()]
             await update.message.reply_text(
                 "ဘယ် user ရဲ့စာရင်းကိုကြည့်မလဲ?",
                 reply_markup=InlineKeyboardMarkup(keyboard)
@@ -1302,51 +1508,19 @@ async def posthis(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("❌ User မရှိပါ")
             return
             
-        if username not in user_data:
+        if username not in tenant.user_data:
             await update.message.reply_text(f"ℹ️ {username} အတွက် စာရင်းမရှိပါ")
             return
             
         # For non-admin, show current date only
         date_key = get_current_date_key() if not is_admin else None
         
-        msg = [f"📊 {username} ရဲ့လောင်းကြေးမှတ်တမ်း"]
-        total_amount = 0
-        pnumber_total = 0
+        # Admin sees all dates, non-admin only the current one
+        dates = [date_key] if date_key is not None else list(tenant.user_data[username])
+        msg = await posthis_report(username, date_key, dates)
         
-        if is_admin:
-            # Admin can see all dates
-            for date_key in user_data[username]:
-                pnum = pnumber_per_date.get(date_key, None)
-                pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-                
-                msg.append(f"\n📅 {date_key}{pnum_str}:")
-                for num, amt in user_data[username][date_key]:
-                    if pnum is not None and num == pnum:
-                        msg.append(f"🔴 {num:02d} ➤ {amt} 🔴")
-                        pnumber_total += amt
-                    else:
-                        msg.append(f"{num:02d} ➤ {amt}")
-                    total_amount += amt
-        else:
-            # Non-admin only sees current date
-            if date_key in user_data[username]:
-                pnum = pnumber_per_date.get(date_key, None)
-                pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-                
-                msg.append(f"\n📅 {date_key}{pnum_str}:")
-                for num, amt in user_data[username][date_key]:
-                    if pnum is not None and num == pnum:
-                        msg.append(f"🔴 {num:02d} ➤ {amt} 🔴")
-                        pnumber_total += amt
-                    else:
-                        msg.append(f"{num:02d} ➤ {amt}")
-                    total_amount += amt
-        
-        if len(msg) > 1:
-            msg.append(f"\n💵 စုစုပေါင်း: {total_amount}")
-            if pnumber_total > 0:
-                msg.append(f"🔴 Power Number စုစုပေါင်း: {pnumber_total}")
-            await update.message.reply_text("\n".join(msg))
+        if msg:
+            await outbound.reply_lines(update, context, msg)
         else:
             await update.message.reply_text(f"ℹ️ {username} အတွက် စာရင်းမရှိပါ")
         
@@ -1355,34 +1529,18 @@ async def posthis(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"❌ Error: {str(e)}")
 
 async def posthis_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
     await query.answer()
     
     try:
         _, username = query.data.split(':')
-        msg = [f"📊 {username} ရဲ့လောင်းကြေးမှတ်တမ်း"]
-        total_amount = 0
-        pnumber_total = 0
-        
-        if username in user_data:
-            for date_key in user_data[username]:
-                pnum = pnumber_per_date.get(date_key, None)
-                pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-                
-                msg.append(f"\n📅 {date_key}{pnum_str}:")
-                for num, amt in user_data[username][date_key]:
-                    if pnum is not None and num == pnum:
-                        msg.append(f"🔴 {num:02d} ➤ {amt} 🔴")
-                        pnumber_total += amt
-                    else:
-                        msg.append(f"{num:02d} ➤ {amt}")
-                    total_amount += amt
+        
+        if username in tenant.user_data:
+            msg = await posthis_report(username, None, list(tenant.user_data[username]))
             
-            if len(msg) > 1:
-                msg.append(f"\n💵 စုစုပေါင်း: {total_amount}")
-                if pnumber_total > 0:
-                    msg.append(f"🔴 Power Number စုစုပေါင်း: {pnumber_total}")
-                await query.edit_message_text("\n".join(msg))
+            if msg:
+                await outbound.edit_lines(query, context, msg)
             else:
                 await query.edit_message_text(f"ℹ️ {username} အတွက် စာရင်းမရှိပါ")
         else:
@@ -1393,9 +1551,9 @@ async def posthis_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await query.edit_message_text("❌ Error occurred")
 
 async def dateall(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
@@ -1406,26 +1564,12 @@ async def dateall(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("ℹ️ မည်သည့်စာရင်းမှ မရှိသေးပါ")
             return
             
-        # Initialize selection dictionary
-        dateall_selections = {date: False for date in all_dates}
-        context.user_data['dateall_selections'] = dateall_selections
-        
-        # Build message with checkboxes
-        msg = ["📅 စာရင်းရှိသည့်နေ့ရက်များကို ရွေးချယ်ပါ:"]
-        buttons = []
-        
-        for date in all_dates:
-            pnum = pnumber_per_date.get(date, None)
-            pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-            
-            is_selected = dateall_selections[date]
-            button_text = f"{date}{pnum_str} {'✅' if is_selected else '⬜'}"
-            buttons.append([InlineKeyboardButton(button_text, callback_data=f"dateall_toggle:{date}")])
-        
-        buttons.append([InlineKeyboardButton("👁‍🗨 View", callback_data="dateall_view")])
-        reply_markup = InlineKeyboardMarkup(buttons)
-        
-        await update.message.reply_text("\n".join(msg), reply_markup=reply_markup)
+        keyboard = SelectionKeyboard(
+            "📅 စာရင်းရှိသည့်နေ့ရက်များကို ရွေးချယ်ပါ:", "dateall_toggle", "dateall_page",
+            date_labels(all_dates), DATEALL_FOOTER,
+        )
+        context.user_data['dateall_keyboard'] = keyboard
+        await keyboard.reply(update.message)
         
     except Exception as e:
         logger.error(f"Error in dateall: {str(e)}")
@@ -1437,154 +1581,49 @@ async def dateall_toggle(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         _, date_key = query.data.split(':')
-        dateall_selections = context.user_data.get('dateall_selections', {})
+        keyboard = context.user_data.get('dateall_keyboard')
         
-        if date_key not in dateall_selections:
+        if keyboard is None or date_key not in keyboard.labels:
             await query.edit_message_text("❌ Error: Date not found")
             return
             
-        # Toggle selection status
-        dateall_selections[date_key] = not dateall_selections[date_key]
-        context.user_data['dateall_selections'] = dateall_selections
-        
-        # Rebuild the message with updated selections
-        msg = ["📅 စာရင်းရှိသည့်နေ့ရက်များကို ရွေးချယ်ပါ:"]
-        buttons = []
-        
-        for date in dateall_selections.keys():
-            pnum = pnumber_per_date.get(date, None)
-            pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-            
-            is_selected = dateall_selections[date]
-            button_text = f"{date}{pnum_str} {'✅' if is_selected else '⬜'}"
-            buttons.append([InlineKeyboardButton(button_text, callback_data=f"dateall_toggle:{date}")])
-        
-        buttons.append([InlineKeyboardButton("👁‍🗨 View", callback_data="dateall_view")])
-        reply_markup = InlineKeyboardMarkup(buttons)
-        
-        await query.edit_message_text("\n".join(msg), reply_markup=reply_markup)
+        keyboard.toggle(date_key)
+        await keyboard.refresh(query)
         
     except Exception as e:
         logger.error(f"Error in dateall_toggle: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
+
 async def dateall_view(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
     await query.answer()
     
     try:
         # 1. Get selected dates
-        dateall_selections = context.user_data.get('dateall_selections', {})
-        selected_dates = [date for date, selected in dateall_selections.items() if selected]
+        keyboard = context.user_data.get('dateall_keyboard')
+        selected_dates = keyboard.chosen() if keyboard else []
         
         if not selected_dates:
             await query.edit_message_text("⚠️ မည်သည့်နေ့ရက်ကိုမှ မရွေးချယ်ထားပါ")
             return
 
-        # 2. Initialize data storage
-        user_reports = {}  # {username: {'total_bet': 0, 'power_bet': 0, 'com': X, 'za': Y}}
-        grand_totals = {
-            'total_bet': 0,
-            'power_bet': 0,
-            'commission': 0,
-            'win_amount': 0,
-            'net_result': 0
-        }
-
-        # 3. Process bets WITHOUT overbuy adjustment
-        for username, user_dates in user_data.items():
-            if username not in user_reports:
-                user_reports[username] = {
-                    'total_bet': 0,
-                    'power_bet': 0,
-                    'com': com_data.get(username, 0),
-                    'za': za_data.get(username, 80)
-                }
-            
-            for date_key in selected_dates:
-                if date_key in user_dates:
-                    # Track total bets
-                    date_total = sum(amt for _, amt in user_dates[date_key])
-                    user_reports[username]['total_bet'] += date_total
-                    
-                    # Track power number bets
-                    pnum = pnumber_per_date.get(date_key)
-                    if pnum is not None:
-                        power_amt = sum(amt for num, amt in user_dates[date_key] if num == pnum)
-                        user_reports[username]['power_bet'] += power_amt
-
-        # 4. Calculate financials
-        messages = ["📊 ရွေးချယ်ထားသော နေ့ရက်များ စုစုပေါင်းရလဒ် (Overbuy မပါ)"]
-        messages.append(f"📅 ရက်စွဲများ: {', '.join(selected_dates)}\n")
-        
-        for username, report in user_reports.items():
-            # Calculate values
-            commission = (report['total_bet'] * report['com']) // 100
-            after_com = report['total_bet'] - commission
-            win_amount = report['power_bet'] * report['za']
-            net_result = after_com - win_amount
-            
-            # Build user message
-            user_msg = [
-                f"👤 {username}",
-                f"💵 စုစုပေါင်းလောင်းကြေး: {report['total_bet']}",
-                f"📊 Com ({report['com']}%): {commission}",
-                f"💰 Com ပြီး: {after_com}"
-            ]
-            
-            if report['power_bet'] > 0:
-                user_msg.extend([
-                    f"🔴 Power Number: {report['power_bet']}",
-                    f"🎯 Za ({report['za']}): {win_amount}"
-                ])
-            
-            user_msg.append(
-                f"📈 ရလဒ်: {abs(net_result)} ({'ဒိုင်ကပေးရန်' if net_result < 0 else 'ဒိုင်ကရမည်'})"
-            )
-            
-            messages.append("\n".join(user_msg))
-            messages.append("⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯")
-            
-            # Update grand totals
-            grand_totals['total_bet'] += report['total_bet']
-            grand_totals['power_bet'] += report['power_bet']
-            grand_totals['commission'] += commission
-            grand_totals['win_amount'] += win_amount
-            grand_totals['net_result'] += net_result
-
-        # 5. Add grand totals
-        messages.append("\n📌 စုစုပေါင်းရလဒ်:")
-        messages.append(f"💵 စုစုပေါင်းလောင်းကြေး: {grand_totals['total_bet']}")
-        messages.append(f"📊 Com စုစုပေါင်း: {grand_totals['commission']}")
-        
-        if grand_totals['power_bet'] > 0:
-            messages.append(f"🔴 Power Number စုစုပေါင်း: {grand_totals['power_bet']}")
-            messages.append(f"🎯 Win Amount စုစုပေါင်း: {grand_totals['win_amount']}")
-        
-        messages.append(
-            f"📊 စုစုပေါင်းရလဒ်: {abs(grand_totals['net_result'])} "
-            f"({'ဒိုင်အရှုံး' if grand_totals['net_result'] < 0 else 'ဒိုင်အမြတ်'})"
-        )
+        # 2. Settle the selected draws as published (overbuy not deducted) in the report pool
+        snapshots = [tenant.draw_snapshots.get(d) for d in selected_dates]
+        messages = await report_pool.lines(dateall_lines, snapshots, list(tenant.user_data),
+                                           dict(tenant.com_data), dict(tenant.za_data))
 
-        # 6. Send message (split if too long)
-        full_message = "\n".join(messages)
-        if len(full_message) > 4000:
-            half = len(messages) // 2
-            await query.edit_message_text("\n".join(messages[:half]))
-            await context.bot.send_message(
-                chat_id=query.message.chat_id,
-                text="\n".join(messages[half:])
-            )
-        else:
-            await query.edit_message_text(full_message)
+        # 3. Send message (packed into as many messages as needed)
+        await outbound.edit_lines(query, context, messages)
 
     except Exception as e:
         logger.error(f"Error in dateall_view: {str(e)}")
         await query.edit_message_text("❌ တွက်ချက်မှုအမှားဖြစ်နေပါသည်")
         
 async def change_working_date(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
         
@@ -1675,11 +1714,11 @@ async def handle_day_selection(update: Update, context: ContextTypes.DEFAULT_TYP
         await query.edit_message_text("❌ Error occurred")
 
 async def set_am_pm(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
     await query.answer()
     
     try:
-        global current_working_date
         time_segment = "AM" if "am" in query.data else "PM"
         date_str = context.user_data.get('selected_date', '')
         
@@ -1687,20 +1726,20 @@ async def set_am_pm(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await query.edit_message_text("❌ Error: Date not selected")
             return
             
-        current_working_date = f"{date_str} {time_segment}"
-        await query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
+        tenant.current_working_date = f"{date_str} {time_segment}"
+        await query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {tenant.current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
         
     except Exception as e:
         logger.error(f"Error in set_am_pm: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
 async def set_am(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global current_working_date
+    tenant = tenants.current()
     try:
-        if current_working_date:
-            date_part = current_working_date.split()[0]
-            current_working_date = f"{date_part} AM"
-            await update.callback_query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
+        if tenant.current_working_date:
+            date_part = tenant.current_working_date.split()[0]
+            tenant.current_working_date = f"{date_part} AM"
+            await update.callback_query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {tenant.current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
         else:
             await update.callback_query.edit_message_text("❌ လက်ရှိနေ့ရက် သတ်မှတ်ထားခြင်းမရှိပါ")
     except Exception as e:
@@ -1708,12 +1747,12 @@ async def set_am(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.callback_query.edit_message_text("❌ Error occurred")
 
 async def set_pm(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global current_working_date
+    tenant = tenants.current()
     try:
-        if current_working_date:
-            date_part = current_working_date.split()[0]
-            current_working_date = f"{date_part} PM"
-            await update.callback_query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
+        if tenant.current_working_date:
+            date_part = tenant.current_working_date.split()[0]
+            tenant.current_working_date = f"{date_part} PM"
+            await update.callback_query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {tenant.current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
         else:
             await update.callback_query.edit_message_text("❌ လက်ရှိနေ့ရက် သတ်မှတ်ထားခြင်းမရှိပါ")
     except Exception as e:
@@ -1721,13 +1760,13 @@ async def set_pm(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.callback_query.edit_message_text("❌ Error occurred")
 
 async def open_current_date(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
     await query.answer()
     
     try:
-        global current_working_date
-        current_working_date = get_current_date_key()
-        await query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
+        tenant.current_working_date = get_current_date_key()
+        await query.edit_message_text(f"✅ လက်ရှိ အလုပ်လုပ်ရမည့်နေ့ရက်ကို {tenant.current_working_date} အဖြစ်ပြောင်းလိုက်ပါပြီ")
     except Exception as e:
         logger.error(f"Error in open_current_date: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
@@ -1743,9 +1782,9 @@ async def back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE):
     await change_working_date(update, context)
 
 async def delete_date(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    global admin_id
+    tenant = tenants.current()
     try:
-        if update.effective_user.id != admin_id:
+        if update.effective_user.id != tenant.admin_id:
             await update.message.reply_text("❌ Admin only command")
             return
             
@@ -1756,26 +1795,12 @@ async def delete_date(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("ℹ️ မည်သည့်စာရင်းမှ မရှိသေးပါ")
             return
             
-        # Initialize selection dictionary
-        datedelete_selections = {date: False for date in available_dates}
-        context.user_data['datedelete_selections'] = datedelete_selections
-        
-        # Build message with checkboxes
-        msg = ["🗑 ဖျက်လိုသောနေ့ရက်များကို ရွေးချယ်ပါ:"]
-        buttons = []
-        
-        for date in available_dates:
-            pnum = pnumber_per_date.get(date, None)
-            pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-            
-            is_selected = datedelete_selections[date]
-            button_text = f"{date}{pnum_str} {'✅' if is_selected else '⬜'}"
-            buttons.append([InlineKeyboardButton(button_text, callback_data=f"datedelete_toggle:{date}")])
-        
-        buttons.append([InlineKeyboardButton("✅ Delete Selected", callback_data="datedelete_confirm")])
-        reply_markup = InlineKeyboardMarkup(buttons)
-        
-        await update.message.reply_text("\n".join(msg), reply_markup=reply_markup)
+        keyboard = SelectionKeyboard(
+            "🗑 ဖျက်လိုသောနေ့ရက်များကို ရွေးချယ်ပါ:", "datedelete_toggle", "datedelete_page",
+            date_labels(available_dates), DATEDELETE_FOOTER,
+        )
+        context.user_data['datedelete_keyboard'] = keyboard
+        await keyboard.reply(update.message)
         
     except Exception as e:
         logger.error(f"Error in delete_date: {str(e)}")
@@ -1787,89 +1812,41 @@ async def datedelete_toggle(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         _, date_key = query.data.split(':')
-        datedelete_selections = context.user_data.get('datedelete_selections', {})
+        keyboard = context.user_data.get('datedelete_keyboard')
         
-        if date_key not in datedelete_selections:
+        if keyboard is None or date_key not in keyboard.labels:
             await query.edit_message_text("❌ Error: Date not found")
             return
             
-        # Toggle selection status
-        datedelete_selections[date_key] = not datedelete_selections[date_key]
-        context.user_data['datedelete_selections'] = datedelete_selections
-        
-        # Rebuild the message with updated selections
-        msg = ["🗑 ဖျက်လိုသောနေ့ရက်များကို ရွေးချယ်ပါ:"]
-        buttons = []
-        
-        for date in datedelete_selections.keys():
-            pnum = pnumber_per_date.get(date, None)
-            pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
-            
-            is_selected = datedelete_selections[date]
-            button_text = f"{date}{pnum_str} {'✅' if is_selected else '⬜'}"
-            buttons.append([InlineKeyboardButton(button_text, callback_data=f"datedelete_toggle:{date}")])
-        
-        buttons.append([InlineKeyboardButton("✅ Delete Selected", callback_data="datedelete_confirm")])
-        reply_markup = InlineKeyboardMarkup(buttons)
-        
-        await query.edit_message_text("\n".join(msg), reply_markup=reply_markup)
+        keyboard.toggle(date_key)
+        await keyboard.refresh(query)
         
     except Exception as e:
         logger.error(f"Error in datedelete_toggle: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
 async def datedelete_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
     query = update.callback_query
     await query.answer()
     
     try:
-        datedelete_selections = context.user_data.get('datedelete_selections', {})
+        keyboard = context.user_data.get('datedelete_keyboard')
         
         # Get selected dates
-        selected_dates = [date for date, selected in datedelete_selections.items() if selected]
+        selected_dates = keyboard.chosen() if keyboard else []
         
         if not selected_dates:
             await query.edit_message_text("⚠️ မည်သည့်နေ့ရက်ကိုမှ မရွေးချယ်ထားပါ")
             return
             
         # Delete data for selected dates
-        for date_key in selected_dates:
-            # Remove from user_data
-            for user in list(user_data.keys()):
-                if date_key in user_data[user]:
-                    del user_data[user][date_key]
-                # Remove user if no dates left
-                if not user_data[user]:
-                    del user_data[user]
-            
-            # Remove from ledger
-            if date_key in ledger:
-                del ledger[date_key]
-            
-            # Remove from break_limits
-            if date_key in break_limits:
-                del break_limits[date_key]
-            
-            # Remove from pnumber_per_date
-            if date_key in pnumber_per_date:
-                del pnumber_per_date[date_key]
-            
-            # Remove from date_control
-            if date_key in date_control:
-                del date_control[date_key]
-            
-            # Remove from overbuy_list
-            if date_key in overbuy_list:
-                del overbuy_list[date_key]
-            
-            # Remove from overbuy_selections
-            if date_key in overbuy_selections:
-                del overbuy_selections[date_key]
+        async with tenant.draw_locks.hold_all(selected_dates):
+            apply_delete_dates(selected_dates)
         
         # Clear current working date if it was deleted
-        global current_working_date
-        if current_working_date in selected_dates:
-            current_working_date = None
+        if tenant.current_working_date in selected_dates:
+            tenant.current_working_date = None
         
         await query.edit_message_text(f"✅ အောက်ပါနေ့ရက်များ ဖျက်ပြီးပါပြီ:\n{', '.join(selected_dates)}")
         
@@ -1877,11 +1854,81 @@ async def datedelete_confirm(update: Update, context: ContextTypes.DEFAULT_TYPE)
         logger.error(f"Error in datedelete_confirm: {str(e)}")
         await query.edit_message_text("❌ Error occurred")
 
+async def selection_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    
+    try:
+        page_data, page = query.data.split(':')
+        keyboard = context.user_data.get(SELECTION_KEYBOARDS[page_data])
+        
+        if keyboard is None:
+            await query.edit_message_text("❌ Error: Selection data not found")
+            return
+            
+        keyboard.turn_page(int(page))
+        await keyboard.refresh(query)
+        
+    except Exception as e:
+        logger.error(f"Error in selection_page: {str(e)}")
+        await query.edit_message_text("❌ Error occurred")
+
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    tenant = tenants.current()
+    try:
+        if update.effective_user.id != tenant.admin_id:
+            await update.message.reply_text("❌ Admin only command")
+            return
+
+        await outbound.reply_lines(update, context, ["📊 Handler stats"] + metrics.summary_lines(tenant.key))
+    except Exception as e:
+        logger.error(f"Error in stats: {str(e)}")
+        await update.message.reply_text(f"❌ Error: {str(e)}")
+
 if __name__ == "__main__":
     if not TOKEN:
         raise ValueError("❌ BOT_TOKEN environment variable is not set")
         
-    app = ApplicationBuilder().token(TOKEN).build()
+    # From here on every tenant, including ones first seen in a new chat, is restored from disk
+    tenants.factory = open_tenant
+    if TENANT_MODE == "chat":
+        tenants_root = os.path.join(DATA_DIR, "tenants")
+        for key in sorted(os.listdir(tenants_root)) if os.path.isdir(tenants_root) else []:
+            tenants.get(key)
+    else:
+        tenants.get(DEFAULT_TENANT)
+
+    metrics_runner = None
+    flush_task = None
+
+    async def post_init(application):
+        global metrics_runner, flush_task
+        # post_init runs before the application is started, so the task is ours to cancel
+        flush_task = asyncio.create_task(tenants.flush_loop())
+        if METRICS_PORT:
+            metrics_runner = await start_metrics_server(metrics, METRICS_HOST, METRICS_PORT)
+
+    async def post_shutdown(application):
+        if flush_task:
+            flush_task.cancel()
+            try:
+                await flush_task
+            except asyncio.CancelledError:
+                pass
+        if metrics_runner:
+            await metrics_runner.cleanup()
+        report_pool.shutdown()
+        for tenant in tenants:
+            tenant.journal.close()
+            tenant.storage.close()
+
+    builder = ApplicationBuilder().token(TOKEN).post_init(post_init).post_shutdown(post_shutdown)
+    builder = builder.context_types(ContextTypes(context=TenantContext))
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(TELEGRAM_API_URL)
+    if CONCURRENT_UPDATES:
+        builder = builder.concurrent_updates(CONCURRENT_UPDATES)
+    app = builder.build()
 
     # ================= Command Handlers =================
     app.add_handler(CommandHandler("start", start))
@@ -1891,6 +1938,8 @@ if __name__ == "__main__":
     app.add_handler(CommandHandler("ledger", ledger_summary))
     app.add_handler(CommandHandler("break", break_command))
     app.add_handler(CommandHandler("overbuy", overbuy))
+    app.add_handler(CommandHandler("bookies", bookies))
+    app.add_handler(CommandHandler("hedge", hedge))
     app.add_handler(CommandHandler("pnumber", pnumber))
     app.add_handler(CommandHandler("comandza", comandza))
     app.add_handler(CommandHandler("total", total))
@@ -1902,6 +1951,7 @@ if __name__ == "__main__":
     app.add_handler(CommandHandler("Cdate", change_working_date))
     app.add_handler(CommandHandler("Ddate", delete_date))
     app.add_handler(CommandHandler("numclose", numclose))
+    app.add_handler(CommandHandler("stats", stats))
 
     # ================= Callback Handlers =================
     # Existing callbacks
@@ -1913,10 +1963,12 @@ if __name__ == "__main__":
     app.add_handler(CallbackQueryHandler(overbuy_select_all, pattern=r"^overbuy_select_all$"))
     app.add_handler(CallbackQueryHandler(overbuy_unselect_all, pattern=r"^overbuy_unselect_all$"))
     app.add_handler(CallbackQueryHandler(overbuy_confirm, pattern=r"^overbuy_confirm$"))
+    app.add_handler(CallbackQueryHandler(hedge_confirm, pattern=r"^hedge_confirm$"))
+    app.add_handler(CallbackQueryHandler(hedge_cancel, pattern=r"^hedge_cancel$"))
     app.add_handler(CallbackQueryHandler(posthis_callback, pattern=r"^posthis:"))
     app.add_handler(CallbackQueryHandler(dateall_toggle, pattern=r"^dateall_toggle:"))
     app.add_handler(CallbackQueryHandler(dateall_view, pattern=r"^dateall_view$"))
-    app.add_handler(CallbackQueryHandler(numclose_delete_all, pattern=r"^numclose_delete_all$"))
+    app.add_handler(CallbackQueryHandler(numclose_delete_all, pattern=r"^numclose_delete_all"))
     
     # Calendar handlers
     app.add_handler(CallbackQueryHandler(show_calendar, pattern=r"^cdate_calendar$"))
@@ -1930,6 +1982,7 @@ if __name__ == "__main__":
     
     app.add_handler(CallbackQueryHandler(datedelete_toggle, pattern=r"^datedelete_toggle:"))
     app.add_handler(CallbackQueryHandler(datedelete_confirm, pattern=r"^datedelete_confirm$"))
+    app.add_handler(CallbackQueryHandler(selection_page, pattern=r"^(overbuy|dateall|datedelete)_page:"))
 
     # ================= Add User System =================
     app.add_handler(CallbackQueryHandler(add_user_callback, pattern=r"^add_user$"))
@@ -1941,8 +1994,21 @@ if __name__ == "__main__":
 
     # ================= Message Handlers =================
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & filters.Regex(r'^[\u1000-\u109F\s]+$'), handle_menu_selection))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, comza_text))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & ComzaPending(app.user_data), comza_text))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
 
-    logger.info("🚀 Bot is starting...")
-    app.run_polling()
+    # Must come after every add_handler so all callbacks get wrapped, and tenants last so the
+    # metrics wrapper already runs against the update's tenant
+    metrics.instrument_application(app)
+    tenants.instrument_application(app)
+
+    if BOT_MODE == "webhook" and WEBHOOK_URL:
+        from webhook import run_webhook
+
+        logger.info(f"🚀 Bot is starting (webhook on port {PORT})...")
+        run_webhook(app, "0.0.0.0", PORT, WEBHOOK_PATH, WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH, WEBHOOK_SECRET)
+    else:
+        if BOT_MODE == "webhook":
+            logger.warning("WEBHOOK_URL is not set, falling back to polling")
+        logger.info("🚀 Bot is starting...")
+        app.run_polling()
@@ -1,7 +1,11 @@
 import json
+import os
 from datetime import datetime
 from typing import Dict, List, Set
 
+from bet_parser import parse_slip
+from number_mask import mask_of
+
 # ==================== သီးသန့်ဒေတာသိမ်းဆည်းမည့်နေရာ ====================
 BLOCKED_NUMBERS_FILE = "blocked_numbers.json"
 USER_LIMITS_FILE = "user_limits.json"
@@ -20,14 +24,21 @@ class DataManager:
 
     @staticmethod
     def save_data(data: Dict, filename: str):
-        with open(filename, 'w') as f:
+        # Write to a temp file and rename so a crash never leaves half a file
+        tmp_name = filename + ".tmp"
+        with open(tmp_name, 'w') as f:
             json.dump(data, f, indent=2)
+        os.replace(tmp_name, filename)
 
-    @staticmethod
-    def log_transaction(message: str):
+    _log_file = None
+
+    @classmethod
+    def log_transaction(cls, message: str):
+        # Keep one line-buffered handle open instead of reopening per call
+        if cls._log_file is None:
+            cls._log_file = open(TRANSACTION_LOG, 'a', buffering=1)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(TRANSACTION_LOG, 'a') as f:
-            f.write(f"[{timestamp}] {message}\n")
+        cls._log_file.write(f"[{timestamp}] {message}\n")
 
 # ==================== စည်းမျဉ်းစီမံခန့်ခွဲမှု ====================
 class RuleManager:
@@ -73,8 +84,25 @@ class BotExtension:
         pass
 
     async def process_user_bets(self, username: str, input_text: str) -> str:
-        # Implement bet processing logic with rules
-        pass
+        blocked = mask_of(n for n in range(100) if self.rule_manager.is_blocked(n, self.current_date))
+        slip = parse_slip(input_text, blocked)
+
+        lines = []
+        total_amount = 0
+        for num, amt in slip.bets:
+            amt = self.rule_manager.check_limit(username, amt)
+            lines.append(f"{num:02d}-{amt}")
+            total_amount += amt
+
+        if lines:
+            lines.append(f"စုစုပေါင်း {total_amount} ကျပ်")
+            DataManager.log_transaction(f"{username} {self.current_date} {len(slip.bets)} bets {total_amount}")
+        if slip.blocked:
+            blocked_nums = ", ".join(sorted({f"{num:02d}" for num, _ in slip.blocked}))
+            lines.append(f"\n🚫 ပိတ်ထားသောဂဏန်းများ: {blocked_nums} (မရပါ)")
+        if not lines:
+            return "⚠️ အချက်အလက်များကိုစစ်ဆေးပါ"
+        return "\n".join(lines)
 
 # ==================== Main Execution ====================
 if __name__ == "__main__":
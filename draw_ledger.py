@@ -0,0 +1,63 @@
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+
+
+# ==================== ပွဲစဉ်တစ်ခုချင်း လည်ချာ ====================
+class DrawLedger:
+    """Stake per number (00-99) for one draw.
+
+    The grand total, the number of non-empty slots and the set of numbers
+    above the break limit are kept up to date on every add/remove, so
+    reading them never rescans the 100 slots.
+    """
+    __slots__ = ("amounts", "total", "active", "limit", "over")
+
+    def __init__(self, limit: Optional[int] = None):
+        self.amounts = array('q', [0]) * 100
+        self.total = 0
+        self.active = 0
+        self.limit = limit
+        self.over = set()
+
+    def _set(self, num: int, value: int):
+        old = self.amounts[num]
+        self.amounts[num] = value
+        self.total += value - old
+        self.active += (value > 0) - (old > 0)
+        if self.limit is not None and value > self.limit:
+            self.over.add(num)
+        else:
+            self.over.discard(num)
+
+    def add(self, num: int, amount: int) -> bool:
+        """Add stake to ``num``; True if this is what pushed it over the break limit."""
+        was_over = num in self.over
+        self._set(num, self.amounts[num] + amount)
+        return not was_over and num in self.over
+
+    def remove(self, num: int, amount: int):
+        # A slot never goes below zero; the old dict ledger dropped such entries
+        self._set(num, max(0, self.amounts[num] - amount))
+
+    def set_limit(self, limit: Optional[int]):
+        self.limit = limit
+        if limit is None:
+            self.over = set()
+        else:
+            self.over = {num for num, amt in enumerate(self.amounts) if amt > limit}
+
+    def over_limit(self) -> Dict[int, int]:
+        """{number: amount above the limit}, in number order."""
+        return {num: self.amounts[num] - self.limit for num in sorted(self.over)}
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return ((num, amt) for num, amt in enumerate(self.amounts) if amt > 0)
+
+    def __getitem__(self, num: int) -> int:
+        return self.amounts[num]
+
+    def __contains__(self, num: int) -> bool:
+        return self.amounts[num] > 0
+
+    def __len__(self) -> int:
+        return self.active
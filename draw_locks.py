@@ -0,0 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable
+
+
+# ==================== ပွဲစဉ်အလိုက် lock များ ====================
+class DrawLocks:
+    """One asyncio.Lock per draw.
+
+    The apply_* mutations never await, so each one is atomic on the event
+    loop. A handler that checks state, awaits Telegram and then mutates
+    holds its draw's lock across the whole sequence, so updates processed
+    concurrently cannot interleave inside it.
+    """
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def __call__(self, date_key: str) -> asyncio.Lock:
+        lock = self._locks.get(date_key)
+        if lock is None:
+            lock = self._locks[date_key] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def hold_all(self, date_keys: Iterable[str]):
+        """Lock several draws, always in the same order so two callers cannot deadlock."""
+        held = []
+        try:
+            for date_key in sorted(set(date_keys)):
+                lock = self(date_key)
+                await lock.acquire()
+                held.append(lock)
+            yield
+        finally:
+            for lock in reversed(held):
+                lock.release()
+
+    def known(self):
+        return list(self._locks)
@@ -0,0 +1,49 @@
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from typing import List, Tuple
+
+SESSION_ORDER = {"AM": 0, "PM": 1}
+
+DrawSortKey = Tuple[date, int, str]
+
+
+def parse_date_key(date_key: str) -> DrawSortKey:
+    """"dd/mm/YYYY AM" -> (date, session, date_key), which sorts chronologically."""
+    try:
+        date_part, session = date_key.split()
+        return datetime.strptime(date_part, "%d/%m/%Y").date(), SESSION_ORDER.get(session, 0), date_key
+    except ValueError:
+        return date.min, 0, date_key
+
+
+# ==================== ပွဲစဉ်ရက်စွဲများ ====================
+class DrawRegistry:
+    """Every draw the book knows about, kept in chronological order."""
+
+    def __init__(self):
+        self._keys: List[DrawSortKey] = []
+        self._members = set()
+
+    def touch(self, date_key: str):
+        if date_key not in self._members:
+            self._members.add(date_key)
+            insort(self._keys, parse_date_key(date_key))
+
+    def discard(self, date_key: str):
+        if date_key in self._members:
+            self._members.discard(date_key)
+            sort_key = parse_date_key(date_key)
+            del self._keys[bisect_left(self._keys, sort_key)]
+
+    def clear(self):
+        self._keys = []
+        self._members = set()
+
+    def newest_first(self) -> List[str]:
+        return [date_key for _, _, date_key in reversed(self._keys)]
+
+    def __contains__(self, date_key: str) -> bool:
+        return date_key in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
@@ -0,0 +1,103 @@
+from itertools import chain
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+from bets import BetBatch
+
+
+# ==================== ပွဲစဉ် snapshot များ ====================
+class BookView:
+    """Frozen copy of one user's UserDrawBook.
+
+    Slips are never changed once added, so the view keeps references to the
+    same BetBatch objects and copies only the running totals.
+    """
+    __slots__ = ("slips", "stake", "by_number")
+
+    def __init__(self, book):
+        self.slips: Tuple[BetBatch, ...] = tuple(book.slips.values())
+        self.stake: int = book.stake
+        self.by_number: Tuple[int, ...] = tuple(book.by_number)
+
+    def bets(self) -> Iterator[Tuple[int, int]]:
+        return chain.from_iterable(self.slips)
+
+
+class DrawSnapshot:
+    """One draw as it stood at ``version``; nothing in it changes after it is published.
+
+    ``books`` is a plain dict so the snapshot can be pickled into a worker
+    process, but it is shared between snapshots and must not be modified.
+    """
+    __slots__ = ("date_key", "version", "amounts", "limit", "pnumber", "books")
+
+    def __init__(self, date_key: str, version: int, amounts: Tuple[int, ...], limit: Optional[int],
+                 pnumber: Optional[int], books: Dict[str, BookView]):
+        self.date_key = date_key
+        self.version = version
+        self.amounts = amounts
+        self.limit = limit
+        self.pnumber = pnumber
+        self.books = books
+
+
+class DrawSnapshots:
+    """Publishes a DrawSnapshot per draw, copy-on-write.
+
+    Every mutation calls ``touch`` with the draw and, if a book changed, its
+    user; that bumps the draw's version. The next ``get`` publishes a new
+    snapshot that re-freezes only the books touched since the last one and
+    shares the rest. Reading a draw nobody changed returns the published
+    snapshot as is. ``source()`` returns (user_data, ledger, break_limits,
+    pnumber_per_date).
+    """
+
+    def __init__(self, source: Callable[[], Tuple[Dict, Dict, Dict, Dict]]):
+        self.source = source
+        self._published: Dict[str, DrawSnapshot] = {}
+        self._dirty: Dict[str, Set[str]] = {}
+        self._versions: Dict[str, int] = {}
+
+    def touch(self, date_key: str, username: Optional[str] = None):
+        self._versions[date_key] = self._versions.get(date_key, 0) + 1
+        users = self._dirty.setdefault(date_key, set())
+        if username is not None:
+            users.add(username)
+
+    def version(self, date_key: str) -> int:
+        return self._versions.get(date_key, 0)
+
+    def get(self, date_key: str) -> DrawSnapshot:
+        snapshot = self._published.get(date_key)
+        if snapshot is not None and date_key not in self._dirty:
+            return snapshot
+
+        user_data, ledger, break_limits, pnumber_per_date = self.source()
+        changed = self._dirty.pop(date_key, set())
+        if snapshot is None:
+            books = {username: BookView(dates[date_key])
+                     for username, dates in user_data.items() if date_key in dates}
+        else:
+            books = dict(snapshot.books)
+            for username in changed:
+                book = user_data.get(username, {}).get(date_key)
+                if book is not None:
+                    books[username] = BookView(book)
+                else:
+                    books.pop(username, None)
+
+        ledger_data = ledger.get(date_key)
+        amounts = tuple(ledger_data.amounts) if ledger_data is not None else (0,) * 100
+        snapshot = self._published[date_key] = DrawSnapshot(
+            date_key, self.version(date_key), amounts, break_limits.get(date_key),
+            pnumber_per_date.get(date_key), books,
+        )
+        return snapshot
+
+    def discard(self, date_key: str):
+        self._published.pop(date_key, None)
+        self._dirty.pop(date_key, None)
+        self.touch(date_key)
+
+    def clear(self):
+        for date_key in list(self._versions):
+            self.discard(date_key)
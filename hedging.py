@@ -0,0 +1,77 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+Allocation = Dict[str, Dict[int, int]]  # {bookie: {num: amount}}
+Bookie = Tuple[str, int]  # (name, capacity per number; 0 = unlimited)
+
+
+# ==================== အလိုအလျောက် တင်ခြင်း ====================
+class HedgePlan(NamedTuple):
+    allocations: Allocation
+    unplaced: Dict[int, int]  # excess no bookie had room for
+    kept: Dict[int, int]  # excess the admin chose not to hedge
+
+    def total(self) -> int:
+        return sum(sum(selected.values()) for selected in self.allocations.values())
+
+
+def plan_hedge(excess: Dict[int, int], bookies: List[Bookie], used: Optional[Allocation] = None,
+               pins: Optional[Dict[int, Optional[str]]] = None) -> HedgePlan:
+    """Split every over-limit amount across the upstream bookies in one pass.
+
+    ``excess`` is {num: amount over the limit}. Bookies are filled in the
+    order given, each up to its per-number capacity less what ``used``
+    says it already took on this draw. ``pins`` is the manual override: a
+    number pinned to a bookie goes to it in full, capacity or not, and a
+    number pinned to None is left unhedged.
+    """
+    used = used or {}
+    pins = pins or {}
+    allocations: Allocation = {name: {} for name, _ in bookies}
+    unplaced: Dict[int, int] = {}
+    kept: Dict[int, int] = {}
+
+    for num in sorted(excess):
+        left = excess[num]
+        if left <= 0:
+            continue
+        if num in pins:
+            target = pins[num]
+            if target is None:
+                kept[num] = left
+            else:
+                allocations.setdefault(target, {})[num] = left
+            continue
+        for name, capacity in bookies:
+            room = left if not capacity else capacity - used.get(name, {}).get(num, 0)
+            take = min(left, room)
+            if take > 0:
+                allocations[name][num] = take
+                left -= take
+                if not left:
+                    break
+        if left:
+            unplaced[num] = left
+
+    return HedgePlan({name: selected for name, selected in allocations.items() if selected}, unplaced, kept)
+
+
+def parse_bookies(args: List[str]) -> List[Bookie]:
+    """["A:50000", "B"] -> [("A", 50000), ("B", 0)]; raises ValueError on a bad entry."""
+    bookies = []
+    for arg in args:
+        name, _, capacity = arg.partition(":")
+        if not name or (capacity and int(capacity) < 0):
+            raise ValueError(arg)
+        bookies.append((name, int(capacity) if capacity else 0))
+    return bookies
+
+
+def parse_pins(args: List[str]) -> Dict[int, Optional[str]]:
+    """["12=A", "34=-"] -> {12: "A", 34: None}; raises ValueError on a bad entry."""
+    pins = {}
+    for arg in args:
+        num, sep, target = arg.partition("=")
+        if not sep or not num.isdigit() or int(num) > 99 or not target:
+            raise ValueError(arg)
+        pins[int(num)] = None if target == "-" else target
+    return pins
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Set, Tuple
+
+from storage import BetStorage
+
+MessageKey = Tuple[int, int]  # (user_id, message_id) of the agent's slip message
+
+
+class SlipRef(NamedTuple):
+    date_key: str
+    username: str
+    slip_id: int
+
+
+# ==================== Delete-button references ====================
+class MessageStore:
+    """Maps each slip message to the slip its 🗑 Delete button removes.
+
+    Only a reference is kept; the bets themselves live in the user's book.
+    Every entry is also written to the backing storage. If that storage
+    persists them (``persists_messages``), it answers for evicted entries
+    and buttons sent before a restart, so a closed draw's entries are
+    dropped from memory and the least recently used ones are evicted past
+    ``capacity``. Otherwise memory is the only copy and entries stay until
+    their slip or draw is deleted.
+    """
+
+    def __init__(self, get_backing: Callable[[], BetStorage], capacity: int = 20000):
+        self.get_backing = get_backing
+        self.capacity = capacity
+        self._entries: "OrderedDict[MessageKey, SlipRef]" = OrderedDict()
+        self._by_draw: Dict[str, Set[MessageKey]] = {}
+
+    def put(self, key: MessageKey, date_key: str, username: str, slip_id: int):
+        self._remember(key, SlipRef(date_key, username, slip_id))
+        self.get_backing().save_message(key[0], key[1], date_key, username, slip_id)
+
+    def get(self, key: MessageKey) -> Optional[SlipRef]:
+        ref = self._entries.get(key)
+        if ref is not None:
+            self._entries.move_to_end(key)
+            return ref
+        found = self.get_backing().find_message(*key)
+        if found is None:
+            return None
+        ref = SlipRef(*found)
+        self._remember(key, ref)
+        return ref
+
+    def pop(self, key: MessageKey):
+        ref = self._entries.pop(key, None)
+        if ref is not None:
+            self._forget(key, ref.date_key)
+
+    def evict_draw(self, date_key: str):
+        """Drop a closed draw's entries from memory, if the backing storage keeps its own copy."""
+        if self.get_backing().persists_messages:
+            self.discard_draw(date_key)
+
+    def discard_draw(self, date_key: str):
+        """Drop a deleted draw's entries; its slips are gone, so their buttons have nothing to delete."""
+        for key in self._by_draw.pop(date_key, ()):
+            del self._entries[key]
+
+    def clear(self):
+        self._entries.clear()
+        self._by_draw.clear()
+
+    def _remember(self, key: MessageKey, ref: SlipRef):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._forget(key, old.date_key)
+        self._entries[key] = ref
+        self._by_draw.setdefault(ref.date_key, set()).add(key)
+        while len(self._entries) > self.capacity and self.get_backing().persists_messages:
+            old_key, old = self._entries.popitem(last=False)
+            self._forget(old_key, old.date_key)
+
+    def _forget(self, key: MessageKey, date_key: str):
+        keys = self._by_draw.get(date_key)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_draw[date_key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,266 @@
+import contextvars
+import functools
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+from telegram.ext import ApplicationHandlerStop
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BET_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# [errored] flag of the handler call running in the current task, so logged errors can be charged to it
+current_call: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("current_call", default=None)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        out = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            out.append(("+Inf" if bound == float("inf") else f"{bound:g}", running))
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            if running >= rank:
+                return bound
+        return float("inf")
+
+
+# ==================== Registry ====================
+class Metrics:
+    """Per-handler call/error/latency counters plus a few bot-level series.
+
+    ``tenant_of()`` names the tenant the running handler call belongs to;
+    calls and errors are also counted per tenant, and ``tenant_gauge``
+    series carry a ``tenant`` label.
+    """
+
+    def __init__(self, prefix: str = "k2dbot", tenant_of: Optional[Callable[[], str]] = None):
+        self.prefix = prefix
+        self.tenant_of = tenant_of
+        self.started = time.time()
+        self.kinds: Dict[str, str] = {}
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.latency: Dict[str, Histogram] = {}
+        self.bets_per_slip = Histogram(BET_BUCKETS)
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self.tenant_calls: Dict[str, int] = defaultdict(int)
+        self.tenant_errors: Dict[str, int] = defaultdict(int)
+        self.tenant_gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+
+    def instrument(self, name: str, kind: str, callback):
+        self.kinds[name] = kind
+        self.latency.setdefault(name, Histogram(LATENCY_BUCKETS))
+
+        @functools.wraps(callback)
+        async def wrapper(update, context):
+            call = [False]
+            token = current_call.set(call)
+            started = time.perf_counter()
+            try:
+                return await callback(update, context)
+            except ApplicationHandlerStop:
+                raise
+            except Exception:
+                call[0] = True
+                raise
+            finally:
+                self.latency[name].observe(time.perf_counter() - started)
+                self.calls[name] += 1
+                if call[0]:
+                    self.errors[name] += 1
+                if self.tenant_of is not None:
+                    tenant = self.tenant_of()
+                    self.tenant_calls[tenant] += 1
+                    if call[0]:
+                        self.tenant_errors[tenant] += 1
+                current_call.reset(token)
+
+        return wrapper
+
+    def instrument_application(self, application):
+        """Wrap the callback of every handler already added to ``application``."""
+        for handlers in application.handlers.values():
+            for handler in handlers:
+                kind = type(handler).__name__.replace("Handler", "").lower()
+                handler.callback = self.instrument(handler.callback.__name__, kind, handler.callback)
+
+    def observe_slip(self, bet_count: int):
+        self.bets_per_slip.observe(bet_count)
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]):
+        """Expose ``read()`` as a gauge; it is called on every scrape."""
+        self.gauges[name] = (help_text, read)
+
+    def tenant_gauge(self, name: str, help_text: str, read: Callable[[], Dict[str, float]]):
+        """Like ``gauge``, but ``read()`` returns {tenant: value} and each tenant gets its own series."""
+        self.tenant_gauges[name] = (help_text, read)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        p = self.prefix
+        out = [
+            f"# HELP {p}_uptime_seconds Seconds since the bot started.",
+            f"# TYPE {p}_uptime_seconds gauge",
+            f"{p}_uptime_seconds {time.time() - self.started:.0f}",
+            f"# HELP {p}_handler_calls_total Handler invocations.",
+            f"# TYPE {p}_handler_calls_total counter",
+        ]
+        names = sorted(self.latency)
+        for name in names:
+            out.append(f'{p}_handler_calls_total{{handler="{name}",kind="{self.kinds[name]}"}} {self.calls[name]}')
+        out += [
+            f"# HELP {p}_handler_errors_total Handler calls that raised or logged an error.",
+            f"# TYPE {p}_handler_errors_total counter",
+        ]
+        for name in names:
+            out.append(f'{p}_handler_errors_total{{handler="{name}",kind="{self.kinds[name]}"}} {self.errors[name]}')
+        out += [
+            f"# HELP {p}_handler_latency_seconds Handler wall time.",
+            f"# TYPE {p}_handler_latency_seconds histogram",
+        ]
+        for name in names:
+            out += self._histogram_lines(f"{p}_handler_latency_seconds", self.latency[name], f'handler="{name}"')
+        out += [
+            f"# HELP {p}_bets_per_slip Bets generated from one accepted slip.",
+            f"# TYPE {p}_bets_per_slip histogram",
+        ]
+        out += self._histogram_lines(f"{p}_bets_per_slip", self.bets_per_slip)
+        for name, (help_text, read) in sorted(self.gauges.items()):
+            try:
+                value = read()
+            except Exception as e:
+                logger.error(f"Error reading gauge {name}: {str(e)}")
+                continue
+            out += [f"# HELP {p}_{name} {help_text}", f"# TYPE {p}_{name} gauge", f"{p}_{name} {value:g}"]
+        if self.tenant_of is not None:
+            out += [
+                f"# HELP {p}_tenant_calls_total Handler invocations per tenant.",
+                f"# TYPE {p}_tenant_calls_total counter",
+            ]
+            for tenant, count in sorted(self.tenant_calls.items()):
+                out.append(f'{p}_tenant_calls_total{{tenant="{tenant}"}} {count}')
+            out += [
+                f"# HELP {p}_tenant_errors_total Handler calls per tenant that raised or logged an error.",
+                f"# TYPE {p}_tenant_errors_total counter",
+            ]
+            for tenant, count in sorted(self.tenant_errors.items()):
+                out.append(f'{p}_tenant_errors_total{{tenant="{tenant}"}} {count}')
+        for name, (help_text, read) in sorted(self.tenant_gauges.items()):
+            try:
+                values = read()
+            except Exception as e:
+                logger.error(f"Error reading gauge {name}: {str(e)}")
+                continue
+            out += [f"# HELP {p}_{name} {help_text}", f"# TYPE {p}_{name} gauge"]
+            out += [f'{p}_{name}{{tenant="{tenant}"}} {value:g}' for tenant, value in sorted(values.items())]
+        return "\n".join(out) + "\n"
+
+    @staticmethod
+    def _histogram_lines(metric: str, hist: Histogram, labels: str = "") -> List[str]:
+        sep = "," if labels else ""
+        lines = [f'{metric}_bucket{{{labels}{sep}le="{le}"}} {count}' for le, count in hist.cumulative()]
+        braces = f"{{{labels}}}" if labels else ""
+        lines.append(f"{metric}_sum{braces} {hist.sum:.6f}")
+        lines.append(f"{metric}_count{braces} {hist.count}")
+        return lines
+
+    def summary_lines(self, tenant: Optional[str] = None) -> List[str]:
+        """Human-readable table for the /stats command, busiest handlers first.
+
+        Tenant series are shown for ``tenant`` only, so one dealer's /stats
+        says nothing about another's book.
+        """
+        lines = ["handler            calls   err   p50ms   p99ms   avgms"]
+        busiest = sorted((n for n in self.latency if self.calls[n]), key=lambda n: -self.latency[n].sum)
+        for name in busiest:
+            hist = self.latency[name]
+            lines.append(
+                f"{name[:18]:<18} {self.calls[name]:>6} {self.errors[name]:>5} "
+                f"{hist.quantile(0.5) * 1000:>7g} {hist.quantile(0.99) * 1000:>7g} "
+                f"{hist.sum / hist.count * 1000:>7.1f}"
+            )
+        slips = self.bets_per_slip
+        if slips.count:
+            lines.append(f"\nslips: {slips.count}  bets/slip avg {slips.sum / slips.count:.1f}  "
+                         f"p99 ≤{slips.quantile(0.99):g}")
+        for name, (_, read) in sorted(self.gauges.items()):
+            try:
+                lines.append(f"{name}: {read():g}")
+            except Exception:
+                pass
+        if tenant is not None:
+            lines.append(f"\ntenant {tenant}: calls {self.tenant_calls.get(tenant, 0)}  "
+                         f"errors {self.tenant_errors.get(tenant, 0)}")
+            for name, (_, read) in sorted(self.tenant_gauges.items()):
+                try:
+                    lines.append(f"{name}: {read().get(tenant, 0):g}")
+                except Exception:
+                    pass
+        lines.append(f"uptime: {timedelta_str(time.time() - self.started)}")
+        return lines
+
+
+def timedelta_str(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m {seconds:02d}s"
+
+
+class ErrorCounter(logging.Handler):
+    """Marks the running handler call as failed when it logs at ERROR.
+
+    The bot's handlers catch their own exceptions and only ``logger.error`` them,
+    so this is where most handler errors are actually counted.
+    """
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+
+    def emit(self, record):
+        call = current_call.get()
+        if call is not None:
+            call[0] = True
+
+
+# ==================== HTTP endpoint ====================
+async def start_metrics_server(metrics: Metrics, host: str, port: int) -> web.AppRunner:
+    async def scrape(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+    web_app = web.Application()
+    web_app.router.add_get("/metrics", scrape)
+    runner = web.AppRunner(web_app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics on http://{host}:{port}/metrics")
+    return runner
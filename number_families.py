@@ -0,0 +1,85 @@
+from functools import lru_cache
+from typing import Tuple
+
+from number_mask import BIT, mask_of
+
+# Every table here is built once at import time and never mutated.
+Family = Tuple[int, ...]
+
+# ==================== ဂဏန်းတစ်လုံးအုပ်စုများ ====================
+# Indexed by digit 0-9
+HEAD = tuple(tuple(d * 10 + j for j in range(10)) for d in range(10))  # ထိပ်: tens digit is d
+TAIL = tuple(tuple(j * 10 + d for j in range(10)) for d in range(10))  # ပိတ်: units digit is d
+BREAK = tuple(tuple(n for n in range(100) if (n // 10 + n % 10) % 10 == d) for d in range(10))  # ဘရိတ်: digit sum ends in d
+INCLUDE = tuple(tuple(sorted(set(HEAD[d]) | set(TAIL[d]))) for d in range(10))  # အပါ: d on either side
+
+# ==================== အုပ်စုများ ====================
+DOUBLES = tuple(d * 11 for d in range(10))  # အပူး
+POWER = (5, 16, 27, 38, 49, 50, 61, 72, 83, 94)  # ပါဝါ
+NAKKHA = (7, 18, 24, 35, 42, 53, 69, 70, 81, 96)  # နက္ခ
+BROTHERS = (1, 12, 23, 34, 45, 56, 67, 78, 89, 90)  # ညီကို
+BROTHERS_REVERSED = (9, 10, 21, 32, 43, 54, 65, 76, 87, 98)  # ကိုညီ
+
+REVERSED = tuple((n % 10) * 10 + n // 10 for n in range(100))
+
+SPECIAL_CASES = {
+    "အပူး": DOUBLES,
+    "ပါဝါ": POWER,
+    "နက္ခ": NAKKHA,
+    "ညီကို": BROTHERS,
+    "ကိုညီ": BROTHERS_REVERSED,
+}
+
+DYNAMIC_EXPANSIONS = {
+    "ထိပ်": HEAD,
+    "ပိတ်": TAIL,
+    "ဘရိတ်": BREAK,
+    "အပါ": INCLUDE,
+}
+
+# ==================== အခွေ ====================
+# Indexed by a 10-bit digit set (bit d set when digit d is in the wheel)
+WHEEL_PAIRS = tuple(
+    tuple(a * 10 + b for a in range(10) if digits >> a & 1 for b in range(10) if digits >> b & 1 and a != b)
+    for digits in range(1 << 10)
+)
+WHEEL_DOUBLES = tuple(tuple(DOUBLES[d] for d in range(10) if digits >> d & 1) for digits in range(1 << 10))
+
+
+def digit_sets(digits: str) -> Tuple[int, int]:
+    """(every digit, digits given more than once) of a wheel's base, as 10-bit sets.
+
+    A repeated digit pairs with itself, so "1123" also yields 11.
+    """
+    seen = repeated = 0
+    for ch in digits:
+        bit = 1 << int(ch)
+        repeated |= seen & bit
+        seen |= bit
+    return seen, repeated
+
+
+def wheel_numbers(digits: str, with_doubles: bool = False) -> Family:
+    """Numbers a wheel over ``digits`` bets on; ``with_doubles`` is အပူးပါအခွေ."""
+    return _wheel_numbers("".join(sorted(digits)), with_doubles)
+
+
+@lru_cache(maxsize=1024)
+def _wheel_numbers(sorted_digits: str, with_doubles: bool) -> Family:
+    every, repeated = digit_sets(sorted_digits)
+    seen = 0
+    out = []
+    for num in WHEEL_PAIRS[every] + WHEEL_DOUBLES[every if with_doubles else repeated]:
+        if not seen & BIT[num]:
+            seen |= BIT[num]
+            out.append(num)
+    return tuple(out)
+
+
+def wheel_cache_info():
+    return _wheel_numbers.cache_info()
+
+
+# ==================== Bitmasks ====================
+SPECIAL_MASKS = {family: mask_of(nums) for family, nums in SPECIAL_CASES.items()}
+DYNAMIC_MASKS = {dtype: tuple(mask_of(nums) for nums in table) for dtype, table in DYNAMIC_EXPANSIONS.items()}
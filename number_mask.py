@@ -0,0 +1,26 @@
+from typing import Iterable, List
+
+# A set of 2D numbers as a 100-bit int: bit n is set when number n is in the set.
+BIT = tuple(1 << n for n in range(100))
+ALL_NUMBERS = (1 << 100) - 1
+
+
+def mask_of(numbers: Iterable[int]) -> int:
+    mask = 0
+    for num in numbers:
+        mask |= BIT[num]
+    return mask
+
+
+def numbers_in(mask: int) -> List[int]:
+    """The numbers whose bits are set, in ascending order."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+def format_mask(mask: int) -> str:
+    return " ".join(f"{n:02d}" for n in numbers_in(mask))
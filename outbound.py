@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, List
+
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+
+
+def pack_lines(items: Iterable[str], limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Join items with newlines into as few messages as possible, each at most ``limit`` chars.
+
+    An item that does not fit in an empty message is split on its own lines,
+    and a single line longer than ``limit`` is cut into ``limit``-sized pieces.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    def pieces(item):
+        if len(item) <= limit:
+            yield item
+            return
+        for line in item.split("\n"):
+            for i in range(0, max(len(line), 1), limit):
+                yield line[i:i + limit]
+
+    for item in items:
+        for piece in pieces(item):
+            extra = len(piece) + (1 if current else 0)
+            if current and size + extra > limit:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+                extra = len(piece)
+            current.append(piece)
+            size += extra
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+# ==================== Rate limiting ====================
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ChatQueue:
+    """One chat's send lock and bucket, and how many sends are waiting on them."""
+    __slots__ = ("lock", "bucket", "pending")
+
+    def __init__(self, rate: float, burst: float):
+        self.lock = asyncio.Lock()
+        self.bucket = TokenBucket(rate, burst)
+        self.pending = 0
+
+
+class OutboundSender:
+    """Paces every outgoing message through a per-chat and a global token bucket.
+
+    Sends to the same chat go out one at a time in call order, and a
+    ``RetryAfter`` from Telegram is waited out and retried. Per-chat state is
+    kept for the ``max_chats`` most recently used chats; older ones with no
+    send in flight are dropped, by which time their buckets have refilled.
+    """
+
+    def __init__(self, per_chat_rate: float = 1.0, per_chat_burst: float = 3,
+                 global_rate: float = 30.0, max_retries: int = 5, max_chats: int = 1024):
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self._chats: "OrderedDict[int, ChatQueue]" = OrderedDict()
+
+    def _queue(self, chat: int) -> ChatQueue:
+        queue = self._chats.get(chat)
+        if queue is None:
+            queue = self._chats[chat] = ChatQueue(self.per_chat_rate, self.per_chat_burst)
+            for key in list(self._chats):
+                if len(self._chats) <= self.max_chats:
+                    break
+                if key != chat and not self._chats[key].pending:
+                    del self._chats[key]
+        else:
+            self._chats.move_to_end(chat)
+        return queue
+
+    async def _call(self, chat: int, send, /, *args, **kwargs):
+        queue = self._queue(chat)
+        queue.pending += 1
+        try:
+            async with queue.lock:
+                for attempt in range(self.max_retries):
+                    await queue.bucket.acquire()
+                    await self.global_bucket.acquire()
+                    try:
+                        return await send(*args, **kwargs)
+                    except RetryAfter as e:
+                        logger.warning(f"Flood limit for chat {chat}, retrying in {e.retry_after}s")
+                        await asyncio.sleep(float(e.retry_after))
+                return await send(*args, **kwargs)
+        finally:
+            queue.pending -= 1
+
+    async def send(self, bot, chat_id: int, text: str, **kwargs):
+        return await self._call(chat_id, bot.send_message, chat_id=chat_id, text=text, **kwargs)
+
+    async def send_lines(self, bot, chat_id: int, lines: Iterable[str], **kwargs):
+        """Send ``lines`` packed into full messages; ``kwargs`` (e.g. reply_markup) go on the last one."""
+        chunks = pack_lines(lines)
+        sent = []
+        for i, chunk in enumerate(chunks):
+            extra = kwargs if i == len(chunks) - 1 else {}
+            sent.append(await self.send(bot, chat_id, chunk, **extra))
+        return sent
+
+    async def reply_lines(self, update, context, lines: Iterable[str], **kwargs):
+        return await self.send_lines(context.bot, update.effective_chat.id, lines, **kwargs)
+
+    async def edit_lines(self, query, context, lines: Iterable[str]):
+        """Put the first packed chunk into the callback's message and send the rest after it."""
+        chunks = pack_lines(lines)
+        if not chunks:
+            return
+        chat_id = query.message.chat_id
+        await self._call(chat_id, query.edit_message_text, chunks[0])
+        for chunk in chunks[1:]:
+            await self.send(context.bot, chat_id, chunk)
@@ -0,0 +1,42 @@
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+RenderKey = Tuple[Optional[str], str, Optional[str]]  # (date_key or None for every draw, report, username)
+
+
+# ==================== Report render cache ====================
+class RenderCache:
+    """Packed report messages, reused until the draws behind them change.
+
+    Each entry is stored with the version of the draw(s) it was rendered
+    from (see DrawSnapshots.version). A lookup with any other version is a
+    miss, so mutations never have to find and drop entries themselves; the
+    least recently used ones are evicted past ``capacity``.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[RenderKey, Tuple[Hashable, List[str]]]" = OrderedDict()
+
+    def get(self, key: RenderKey, version: Hashable) -> Optional[List[str]]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: RenderKey, version: Hashable, chunks: List[str]):
+        self._entries[key] = (version, chunks)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
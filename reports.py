@@ -0,0 +1,240 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from draw_snapshots import DrawSnapshot
+from number_mask import BIT, format_mask
+from outbound import pack_lines
+
+
+# ==================== Report worker pool ====================
+class ReportPool:
+    """Runs report builders in a thread or process pool instead of on the event loop.
+
+    Handlers pass frozen DrawSnapshots and copies of the small dicts, then
+    await ``lines``; bets keep being handled while the pool formats and packs
+    the report. Threads share the snapshots as they are; a process pool
+    sidesteps the GIL but pickles every snapshot it is sent, so it pays off
+    only when formatting outweighs copying the draw.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 2):
+        self.kind = kind
+        self.workers = workers
+        self.running = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="report")
+        return self._executor
+
+    async def run(self, fn, *args):
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.running -= 1
+
+    async def lines(self, builder, *args) -> List[str]:
+        """Run a report builder and pack its lines into messages, both in the pool."""
+        return await self.run(build_packed, builder, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# ==================== Report builders ====================
+# Everything below reads only snapshots and copies, so it can run in a worker
+# thread or be pickled into a worker process. An empty list means nothing to report.
+
+def build_packed(builder, *args) -> List[str]:
+    lines = builder(*args)
+    return pack_lines(lines) if lines else []
+
+
+def ledger_lines(snapshot: DrawSnapshot, closed: int) -> List[str]:
+    """/ledger: stake per number with the power number and closed numbers marked."""
+    lines = [f"📒 {snapshot.date_key} လက်ကျန်ငွေစာရင်း"]
+    amounts = snapshot.amounts
+    pnum = snapshot.pnumber
+
+    for i, total in enumerate(amounts):
+        if total <= 0:
+            continue
+        if i == pnum:
+            lines.append(f"🔴 {i:02d} ➤ {total} 🔴")
+        elif closed & BIT[i]:
+            lines.append(f"🚫 {i:02d} ➤ {total} (Closed)")
+        else:
+            lines.append(f"{i:02d} ➤ {total}")
+
+    if len(lines) == 1:
+        return []
+    if pnum is not None:
+        lines.append(f"\n🔴 Power Number: {pnum:02d} ➤ {amounts[pnum]}")
+    if closed:
+        lines.append(f"\n🔒 Closed Numbers: {format_mask(closed)}")
+    lines.append(f"\n💰 စုစုပေါင်း: {sum(amounts)} ကျပ်")
+    return lines
+
+
+def history_lines(username: str, snapshots: List[DrawSnapshot]) -> List[str]:
+    """/posthis: every bet per draw with the power number marked."""
+    msg = [f"📊 {username} ရဲ့လောင်းကြေးမှတ်တမ်း"]
+    total_amount = 0
+    pnumber_total = 0
+
+    for snapshot in snapshots:
+        view = snapshot.books.get(username)
+        if view is None:
+            continue
+        pnum = snapshot.pnumber
+        pnum_str = f" [P: {pnum:02d}]" if pnum is not None else ""
+
+        msg.append(f"\n📅 {snapshot.date_key}{pnum_str}:")
+        for num, amt in view.bets():
+            if pnum is not None and num == pnum:
+                msg.append(f"🔴 {num:02d} ➤ {amt} 🔴")
+                pnumber_total += amt
+            else:
+                msg.append(f"{num:02d} ➤ {amt}")
+            total_amount += amt
+
+    if len(msg) == 1:
+        return []
+    msg.append(f"\n💵 စုစုပေါင်း: {total_amount}")
+    if pnumber_total > 0:
+        msg.append(f"🔴 Power Number စုစုပေါင်း: {pnumber_total}")
+    return msg
+
+
+def tsent_lines(snapshot: DrawSnapshot, usernames: List[str]) -> List[str]:
+    """/tsent: one block per user with bets on the draw, then the closing line."""
+    date_key = snapshot.date_key
+    reports = []
+    for user in usernames:
+        view = snapshot.books.get(user)
+        if view is None:
+            continue
+        user_report = [f"👤 {user} - {date_key}:"]
+        user_report.extend(f"  - {num:02d} ➤ {amt}" for num, amt in view.bets())
+        user_report.append(f"💵 စုစုပေါင်း: {view.stake}")
+        reports.append("\n".join(user_report))
+
+    reports.append(f"✅ {date_key} အတွက် စာရင်းများအားလုံး ပေးပို့ပြီးပါပြီ")
+    return reports
+
+
+def draw_totals(snapshot: DrawSnapshot, usernames: Iterable[str]) -> Dict[str, Tuple[int, int]]:
+    """{username: (stake, power-number stake)} for those in ``usernames`` with bets on the draw."""
+    pnum = snapshot.pnumber
+    totals = {}
+    for username in usernames:
+        view = snapshot.books.get(username)
+        if view is not None:
+            totals[username] = (view.stake, view.by_number[pnum] if pnum is not None else 0)
+    return totals
+
+
+def total_lines(snapshot: DrawSnapshot, usernames: List[str], com_data: Dict[str, int],
+                za_data: Dict[str, int]) -> List[str]:
+    """/total for one draw, which must have a power number."""
+    pnum = snapshot.pnumber
+    totals = draw_totals(snapshot, usernames)
+    msg = [f"📊 {snapshot.date_key} အတွက် စုပေါင်းရလဒ်"]
+    total_net = 0
+
+    for username, (stake, power) in totals.items():
+        com = com_data.get(username, 0)
+        za = za_data.get(username, 0)
+        commission = (stake * com) // 100
+        after_com = stake - commission
+        win = power * za
+        net = after_com - win
+        total_net += net
+        status = "ဒိုင်ကပေးရမည်" if net < 0 else "ဒိုင်ကရမည်"
+        msg.append(
+            f"👤 {username}\n"
+            f"💵 စုစုပေါင်း: {stake}\n"
+            f"📊 Com({com}%) ➤ {commission}\n"
+            f"💰 Com ပြီး: {after_com}\n"
+            f"🔢 Power Number({pnum:02d}) ➤ {power}\n"
+            f"🎯 Za({za}) ➤ {win}\n"
+            f"📈 ရလဒ်: {abs(net)} ({status})\n"
+            "-----------------"
+        )
+
+    if len(msg) == 1:
+        return []
+    msg.append(f"\n📊 စုစုပေါင်းရလဒ်: {abs(total_net)} ({'ဒိုင်အရှုံး' if total_net < 0 else 'ဒိုင်အမြတ်'})")
+    return msg
+
+
+def dateall_lines(snapshots: List[DrawSnapshot], usernames: List[str], com_data: Dict[str, int],
+                  za_data: Dict[str, int]) -> List[str]:
+    """/dateall: settle ``usernames`` on the sum of the selected draws (overbuy not deducted)."""
+    selected_dates = [snapshot.date_key for snapshot in snapshots]
+    totals: Dict[str, List[int]] = {}
+    for snapshot in snapshots:
+        for username, (stake, power) in draw_totals(snapshot, snapshot.books).items():
+            summed = totals.setdefault(username, [0, 0])
+            summed[0] += stake
+            summed[1] += power
+
+    messages = ["📊 ရွေးချယ်ထားသော နေ့ရက်များ စုစုပေါင်းရလဒ် (Overbuy မပါ)"]
+    messages.append(f"📅 ရက်စွဲများ: {', '.join(selected_dates)}\n")
+    total_stake = total_power = total_commission = total_win = total_net = 0
+
+    for username in usernames:
+        stake, power = totals.get(username, (0, 0))
+        com = com_data.get(username, 0)
+        za = za_data.get(username, 80)
+        commission = (stake * com) // 100
+        after_com = stake - commission
+        win = power * za
+        net = after_com - win
+        total_stake += stake
+        total_power += power
+        total_commission += commission
+        total_win += win
+        total_net += net
+
+        user_msg = [
+            f"👤 {username}",
+            f"💵 စုစုပေါင်းလောင်းကြေး: {stake}",
+            f"📊 Com ({com}%): {commission}",
+            f"💰 Com ပြီး: {after_com}"
+        ]
+
+        if power > 0:
+            user_msg.extend([
+                f"🔴 Power Number: {power}",
+                f"🎯 Za ({za}): {win}"
+            ])
+
+        user_msg.append(
+            f"📈 ရလဒ်: {abs(net)} ({'ဒိုင်ကပေးရန်' if net < 0 else 'ဒိုင်ကရမည်'})"
+        )
+
+        messages.append("\n".join(user_msg))
+        messages.append("⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯⎯")
+
+    messages.append("\n📌 စုစုပေါင်းရလဒ်:")
+    messages.append(f"💵 စုစုပေါင်းလောင်းကြေး: {total_stake}")
+    messages.append(f"📊 Com စုစုပေါင်း: {total_commission}")
+
+    if total_power > 0:
+        messages.append(f"🔴 Power Number စုစုပေါင်း: {total_power}")
+        messages.append(f"🎯 Win Amount စုစုပေါင်း: {total_win}")
+
+    messages.append(
+        f"📊 စုစုပေါင်းရလဒ်: {abs(total_net)} "
+        f"({'ဒိုင်အရှုံး' if total_net < 0 else 'ဒိုင်အမြတ်'})"
+    )
+    return messages
@@ -0,0 +1,94 @@
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+PAGE_SIZE = 50  # Entries per keyboard page
+
+
+# ==================== ရွေးချယ်ရန် keyboard ====================
+class SelectionKeyboard:
+    """A checklist behind an inline keyboard that keeps its rendered rows.
+
+    Each entry's button row is built once and rebuilt only when that entry
+    is toggled, so a tap costs one row rather than the whole list. Lists
+    longer than ``page_size`` get ◀️/▶️ page buttons. ``refresh`` remembers
+    what the message currently shows and skips the edit when a tap did not
+    change it.
+    """
+
+    def __init__(self, title: str, toggle_data: str, page_data: str, entries: Iterable[Tuple[Hashable, str]],
+                 footer: List[List[InlineKeyboardButton]], selected: Iterable[Hashable] = (),
+                 page_size: int = PAGE_SIZE):
+        self.title = title
+        self.toggle_data = toggle_data
+        self.page_data = page_data
+        self.labels = dict(entries)
+        self.keys = list(self.labels)
+        self.selected = set(selected) & set(self.keys)
+        self.footer = footer
+        self.page_size = page_size
+        self.page = 0
+        self._rows = {key: self._render(key) for key in self.keys}
+        self._shown: Optional[tuple] = None
+
+    def _render(self, key):
+        mark = '✅' if key in self.selected else '⬜'
+        return [InlineKeyboardButton(f"{self.labels[key]} {mark}", callback_data=f"{self.toggle_data}:{key}")]
+
+    def toggle(self, key) -> bool:
+        """Flip one entry; raises KeyError if it is not in the list. Returns the new state."""
+        if key not in self.labels:
+            raise KeyError(key)
+        self.selected ^= {key}
+        self._rows[key] = self._render(key)
+        return key in self.selected
+
+    def set_all(self, on: bool):
+        for key in self.keys:
+            if (key in self.selected) != on:
+                self.toggle(key)
+
+    def chosen(self) -> list:
+        """Selected keys in display order."""
+        return [key for key in self.keys if key in self.selected]
+
+    def pages(self) -> int:
+        return max(1, -(-len(self.keys) // self.page_size))
+
+    def turn_page(self, page: int):
+        self.page = max(0, min(page, self.pages() - 1))
+
+    def _page_keys(self):
+        start = self.page * self.page_size
+        return self.keys[start:start + self.page_size]
+
+    def text(self) -> str:
+        if self.pages() > 1:
+            return f"{self.title} ({self.page + 1}/{self.pages()})"
+        return self.title
+
+    def markup(self) -> InlineKeyboardMarkup:
+        rows = [self._rows[key] for key in self._page_keys()]
+        if self.pages() > 1:
+            rows.append([
+                InlineKeyboardButton("◀️", callback_data=f"{self.page_data}:{self.page - 1}"),
+                InlineKeyboardButton(f"{self.page + 1}/{self.pages()}", callback_data=f"{self.page_data}:{self.page}"),
+                InlineKeyboardButton("▶️", callback_data=f"{self.page_data}:{self.page + 1}"),
+            ])
+        return InlineKeyboardMarkup(rows + self.footer)
+
+    def _state(self) -> tuple:
+        return self.page, tuple(key in self.selected for key in self._page_keys())
+
+    async def reply(self, message):
+        self._shown = self._state()
+        return await message.reply_text(self.text(), reply_markup=self.markup())
+
+    async def refresh(self, query) -> bool:
+        """Edit the message to match; returns False without calling Telegram if it already does."""
+        state = self._state()
+        if state == self._shown:
+            return False
+        await query.edit_message_text(self.text(), reply_markup=self.markup())
+        self._shown = state
+        return True
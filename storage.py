@@ -0,0 +1,96 @@
+import sqlite3
+from typing import Iterable, Optional, Tuple
+
+
+# ==================== Storage interface ====================
+class BetStorage:
+    """Where the slips behind 🗑 Delete buttons are kept outside the process.
+
+    The bets themselves are restored from the journal and reports read them
+    from memory, so only the message references are stored here. Removals
+    mirror the apply_* mutations in bot.py and must be idempotent, because
+    journal replay on startup may repeat ones the store already has.
+    """
+
+    persists_messages = False  # True if find_message can answer for refs no longer held in memory
+
+    def remove_slip(self, slip_id: int):
+        pass
+
+    def remove_dates(self, date_keys: Iterable[str]):
+        pass
+
+    def clear(self):
+        pass
+
+    def save_message(self, user_id: int, message_id: int, date_key: str, username: str, slip_id: int):
+        """Remember which slip a 🗑 Delete button refers to; dropped with the slip or its date."""
+        pass
+
+    def find_message(self, user_id: int, message_id: int) -> Optional[Tuple[str, str, int]]:
+        """(date_key, username, slip_id) saved by save_message, if this store persists them."""
+        return None
+
+    def close(self):
+        pass
+
+
+# ==================== In-memory (default) ====================
+class MemoryStorage(BetStorage):
+    """Keeps nothing; Delete-button references live only in the MessageStore's memory."""
+
+
+# ==================== SQLite ====================
+SCHEMA = """
+DROP TABLE IF EXISTS bets;
+CREATE TABLE IF NOT EXISTS messages (
+    user_id    INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    date_key   TEXT    NOT NULL,
+    username   TEXT    NOT NULL,
+    slip_id    INTEGER NOT NULL,
+    PRIMARY KEY (user_id, message_id)
+);
+CREATE INDEX IF NOT EXISTS messages_slip ON messages (slip_id);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date_key);
+"""
+
+
+class SqliteStorage(BetStorage):
+    persists_messages = True
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def remove_slip(self, slip_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM messages WHERE slip_id = ?", (slip_id,))
+
+    def remove_dates(self, date_keys):
+        date_keys = [(d,) for d in date_keys]
+        with self.conn:
+            self.conn.executemany("DELETE FROM messages WHERE date_key = ?", date_keys)
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM messages")
+
+    def save_message(self, user_id, message_id, date_key, username, slip_id):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO messages (user_id, message_id, date_key, username, slip_id) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, message_id, date_key, username, slip_id)
+            )
+
+    def find_message(self, user_id, message_id):
+        return self.conn.execute(
+            "SELECT date_key, username, slip_id FROM messages WHERE user_id = ? AND message_id = ?",
+            (user_id, message_id)
+        ).fetchone()
+
+    def close(self):
+        self.conn.close()
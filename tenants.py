@@ -0,0 +1,182 @@
+import asyncio
+import contextvars
+import functools
+import itertools
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from telegram.ext import CallbackContext
+
+from alerts import LimitAlerts
+from draw_locks import DrawLocks
+from draw_registry import DrawRegistry
+from draw_snapshots import DrawSnapshots
+from journal import Journal
+from message_store import MessageStore
+from render_cache import RenderCache
+from storage import BetStorage, MemoryStorage
+
+DEFAULT_TENANT = "default"
+
+# Book the update being handled in the current task belongs to; unset means the default one
+current_tenant: contextvars.ContextVar[Optional["Tenant"]] = contextvars.ContextVar("current_tenant", default=None)
+
+
+# ==================== ဒိုင်တစ်ဦးချင်း စာရင်း ====================
+class Tenant:
+    """One dealer's book: its admin, agents, ledger, limits, closed numbers and com/za.
+
+    Nothing here is shared with another tenant. The handlers in bot.py read
+    and change whichever tenant ``current_tenant`` holds for the update they
+    are processing, so two dealer groups served by the same Application
+    never see each other's draws, locks, Delete buttons or journal.
+    """
+
+    def __init__(self, key: str, message_store_size: int = 20000, render_cache_size: int = 256):
+        self.key = key
+        self.admin_id: Optional[int] = None
+        self.user_data: Dict = {}  # {username: {date_key: UserDrawBook}}
+        self.ledger: Dict = {}  # {date_key: DrawLedger}
+        self.break_limits: Dict[str, int] = {}  # {date_key: limit}
+        self.pnumber_per_date: Dict[str, int] = {}  # {date_key: power_number}
+        self.date_control: Dict[str, bool] = {}  # {date_key: True/False}
+        self.overbuy_list: Dict = {}  # {date_key: {username: {num: amount}}}
+        self.overbuy_selections: Dict = {}  # {date_key: {username: {num: amount}}}
+        self.hedge_bookies: List[Tuple[str, int]] = []  # [(bookie, capacity per number, 0 = unlimited)]
+        self.current_working_date: Optional[str] = None  # For admin date selection
+        self.closed_numbers: Dict[str, int] = {}  # {date_key: 100-bit mask of numbers not accepted}
+        self.com_data: Dict[str, int] = {}
+        self.za_data: Dict[str, int] = {}
+        self.slip_ids = itertools.count(1)  # Identifies each slip inside a UserDrawBook
+        self.last_slip_id = 0  # Highest slip id ever applied; restored so ids are never reissued
+
+        self.draws = DrawRegistry()
+        self.draw_locks = DrawLocks()
+        self.draw_snapshots = DrawSnapshots(
+            lambda: (self.user_data, self.ledger, self.break_limits, self.pnumber_per_date)
+        )
+        self.storage: BetStorage = MemoryStorage()
+        self.message_store = MessageStore(lambda: self.storage, message_store_size)
+        self.render_cache = RenderCache(render_cache_size)
+        self.journal: Optional[Journal] = None  # set once the tenant's state has been restored
+        self.limit_alerts: Optional[LimitAlerts] = None
+        self.slips = 0  # slips accepted, for the per-tenant metrics
+
+    def __repr__(self):
+        return f"Tenant({self.key!r}, admin_id={self.admin_id})"
+
+
+class TenantContext(CallbackContext):
+    """CallbackContext whose ``user_data`` is kept apart per tenant.
+
+    Handlers park half-finished screens in ``context.user_data`` (the
+    overbuy keyboard, a /hedge plan, the user picked for com/za), and
+    python-telegram-bot keys that dict by user alone. Without this an admin
+    of two groups could confirm one group's overbuy from the other's chat.
+    """
+
+    @property
+    def user_data(self) -> Optional[Dict]:
+        data = super().user_data
+        if data is None:
+            return None
+        tenant = current_tenant.get()
+        return data.setdefault(tenant.key if tenant is not None else DEFAULT_TENANT, {})
+
+
+# ==================== Tenant registry ====================
+def is_start(update) -> bool:
+    message = getattr(update, "message", None)
+    words = (getattr(message, "text", None) or "").split()
+    return bool(words) and words[0].split("@")[0] == "/start"
+
+
+class Tenants:
+    """Every book served by this process.
+
+    In ``single`` mode all updates share the default tenant, which is how
+    the bot has always behaved. In ``chat`` mode every chat is its own book:
+    a dealer adds the bot to their group, sends /start there to become its
+    admin, and agents post slips in that group. ``factory(key)`` builds a
+    tenant, restoring its saved state if there is any.
+
+    A chat only gets a book (and its directory, journal and database) when
+    /start is sent in it, or, if ``allowed`` is given, only when it is one
+    of those chat ids. Updates from any other chat are dropped unhandled.
+
+    The bot reads slips as plain group messages, so in ``chat`` mode its
+    group privacy mode must be turned off in @BotFather (/setprivacy);
+    otherwise Telegram only delivers commands and replies to the bot and
+    agents' slips never arrive.
+    """
+
+    def __init__(self, factory: Callable[[str], Tenant], mode: str = "single",
+                 allowed: Optional[Iterable[str]] = None):
+        self.factory = factory
+        self.mode = mode
+        self.allowed = set(allowed) if allowed is not None else None
+        self._tenants: Dict[str, Tenant] = {}
+
+    def get(self, key: str) -> Tenant:
+        tenant = self._tenants.get(key)
+        if tenant is None:
+            tenant = self._tenants[key] = self.factory(key)
+        return tenant
+
+    def key_of(self, update) -> Optional[str]:
+        """The tenant ``update`` belongs to, or None if its chat has no book and may not open one."""
+        if self.mode != "chat" or update.effective_chat is None:
+            return DEFAULT_TENANT
+        key = str(update.effective_chat.id)
+        if key in self._tenants:
+            return key
+        if self.allowed is not None:
+            return key if key in self.allowed else None
+        return key if is_start(update) else None
+
+    def current(self) -> Tenant:
+        tenant = current_tenant.get()
+        return tenant if tenant is not None else self.get(DEFAULT_TENANT)
+
+    @contextmanager
+    def using(self, tenant: Tenant):
+        """Run a block (a replay, a script) against ``tenant`` instead of the current one."""
+        token = current_tenant.set(tenant)
+        try:
+            yield tenant
+        finally:
+            current_tenant.reset(token)
+
+    def instrument(self, callback):
+        @functools.wraps(callback)
+        async def wrapper(update, context):
+            key = self.key_of(update)
+            if key is None:
+                return None
+            token = current_tenant.set(self.get(key))
+            try:
+                return await callback(update, context)
+            finally:
+                current_tenant.reset(token)
+
+        return wrapper
+
+    def instrument_application(self, application):
+        """Run every handler already added to ``application`` against its update's tenant."""
+        for handlers in application.handlers.values():
+            for handler in handlers:
+                handler.callback = self.instrument(handler.callback)
+
+    async def flush_loop(self, interval: float = 0.5):
+        """Flush every tenant's journal, including tenants created after the loop started."""
+        while True:
+            await asyncio.sleep(interval)
+            for tenant in list(self):
+                if tenant.journal is not None:
+                    tenant.journal.flush()
+
+    def __iter__(self) -> Iterator[Tenant]:
+        return iter(self._tenants.values())
+
+    def __len__(self) -> int:
+        return len(self._tenants)
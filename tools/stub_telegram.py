@@ -0,0 +1,107 @@
+"""Local stand-in for the Telegram Bot API, for trying webhook mode offline.
+
+Start the stub, then the bot pointed at it:
+
+    python tools/stub_telegram.py --webhook http://127.0.0.1:8080/telegram
+    BOT_TOKEN=123:stub TELEGRAM_API_URL=http://127.0.0.1:8081/bot \\
+        BOT_MODE=webhook WEBHOOK_URL=http://127.0.0.1:8080 python bot.py
+
+The stub answers the Bot API methods the bot calls and prints every message
+the bot sends. Once the bot registers its webhook, the stub posts a short
+scripted session of fake updates to it.
+"""
+import argparse
+import asyncio
+import itertools
+import time
+
+from aiohttp import ClientSession, web
+
+ADMIN = {"id": 1, "is_bot": False, "first_name": "Admin", "username": "admin"}
+AGENT = {"id": 2, "is_bot": False, "first_name": "Agent", "username": "agent"}
+
+SCRIPT = [
+    (ADMIN, "/start"),
+    (ADMIN, "/dateopen"),
+    (AGENT, "12-1000\n34r500\n1234 အခွေ 200\nအပူး 100"),
+    (AGENT, "5 ထိပ် 300"),
+    (ADMIN, "/ledger"),
+    (ADMIN, "/tsent"),
+    (ADMIN, "/stats"),
+]
+
+message_ids = itertools.count(1)
+update_ids = itertools.count(1)
+
+
+def make_update(user, text):
+    message = {
+        "message_id": next(message_ids),
+        "date": int(time.time()),
+        "chat": {"id": user["id"], "type": "private"},
+        "from": user,
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": next(update_ids), "message": message}
+
+
+async def post_script(webhook_url, secret, delay):
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret else {}
+    async with ClientSession() as session:
+        for user, text in SCRIPT:
+            await asyncio.sleep(delay)
+            async with session.post(webhook_url, json=make_update(user, text), headers=headers) as resp:
+                print(f">>> {user['username']}: {text!r} [{resp.status}]")
+
+
+def build_app(args):
+    me = {"id": 999, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}
+    started = {"script": False}
+
+    async def api(request):
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        if request.content_type == "application/json":
+            params.update(await request.json())
+
+        if method == "getMe":
+            result = me
+        elif method == "setWebhook":
+            result = True
+            if not started["script"]:
+                started["script"] = True
+                asyncio.get_running_loop().create_task(
+                    post_script(params.get("url", args.webhook), params.get("secret_token"), args.delay)
+                )
+        elif method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id", 0))
+            print(f"<<< {method} to {chat_id}:\n{params.get('text', '')}\n")
+            result = {
+                "message_id": next(message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    app = web.Application()
+    app.router.add_route("*", "/bot{token}/{method}", api)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Telegram Bot API server")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--webhook", default="http://127.0.0.1:8080/telegram",
+                        help="where to post fake updates if the bot does not send a URL")
+    parser.add_argument("--delay", type=float, default=0.5, help="seconds between fake updates")
+    args = parser.parse_args()
+    web.run_app(build_app(args), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import hmac
+import logging
+import secrets
+import signal
+from typing import Optional
+
+from aiohttp import web
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+# ==================== Webhook server ====================
+def build_web_app(application, path: str, secret: str) -> web.Application:
+    """aiohttp app that feeds POSTed updates into ``application`` and answers /health.
+
+    Updates whose secret header does not match ``secret`` are refused, so
+    only Telegram, which was given the secret in set_webhook, can post them.
+    """
+    if not secret:
+        raise ValueError("a webhook secret is required")
+
+    async def handle_update(request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+            return web.Response(status=403)
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        return web.Response()
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok" if application.running else "starting",
+            "pending_updates": application.update_queue.qsize(),
+        })
+
+    web_app = web.Application()
+    web_app.router.add_post(path, handle_update)
+    web_app.router.add_get("/health", health)
+    return web_app
+
+
+async def serve_webhook(application, listen: str, port: int, path: str, webhook_url: str,
+                        secret: Optional[str] = None):
+    if not secret:
+        # Never listen unauthenticated: without a configured secret, make one up for this run
+        secret = secrets.token_urlsafe(32)
+        logger.warning("WEBHOOK_SECRET is not set; using a generated secret until the bot restarts")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.bot.set_webhook(url=webhook_url, secret_token=secret,
+                                      allowed_updates=Update.ALL_TYPES)
+    await application.start()
+
+    runner = web.AppRunner(build_web_app(application, path, secret))
+    await runner.setup()
+    await web.TCPSite(runner, listen, port).start()
+    logger.info(f"Webhook listening on {listen}:{port}{path}")
+
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        await application.stop()
+        if application.post_stop:
+            await application.post_stop(application)
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def run_webhook(application, listen: str, port: int, path: str, webhook_url: str, secret: Optional[str] = None):
+    asyncio.run(serve_webhook(application, listen, port, path, webhook_url, secret))